@@ -10,15 +10,48 @@ Created: October 2025
 Version: 1.0
 """
 
+import json
 import time
+import random
 import logging
+import threading
+from email.utils import parsedate_to_datetime
 from typing import Callable, Any, Optional, List, Tuple
 from functools import wraps
 
+try:
+    import orjson
+except ImportError:  # Optional speed-up; fall back to the stdlib json module
+    orjson = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 
+def json_loads(data) -> Any:
+    """Parse JSON from str or bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return json.loads(data)
+
+
+def json_dumps(value, indent: bool = False) -> str:
+    """
+    Serialize a value to a UTF-8 JSON string, using orjson when available.
+    
+    Args:
+        value: Object to serialize
+        indent: Pretty-print with two-space indentation
+        
+    Returns:
+        JSON text (non-ASCII characters are kept as-is, not escaped)
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(value, option=option).decode('utf-8')
+    return json.dumps(value, indent=2 if indent else None, ensure_ascii=False)
+
+
 def run_resiliently(
     func: Callable,
     *args,
@@ -29,6 +62,9 @@ def run_resiliently(
     retryable_exceptions: Optional[Tuple[type, ...]] = None,
     retryable_status_codes: Optional[List[int]] = None,
     rate_limit_delay: float = 0.0,
+    jitter: float = 0.0,
+    rate_limiter: Optional['TokenBucket'] = None,
+    retry_if: Optional[Callable[[Exception], bool]] = None,
     **kwargs
 ) -> Any:
     """
@@ -47,6 +83,12 @@ def run_resiliently(
         retryable_exceptions: Tuple of exception types to retry on
         retryable_status_codes: List of HTTP status codes to retry on
         rate_limit_delay: Fixed delay before each call for rate limiting
+        jitter: Random extra fraction of the delay added to each wait, so
+            concurrent callers don't retry in lockstep (default: 0.0)
+        rate_limiter: Shared TokenBucket to take a token from before each call
+        retry_if: Predicate checked before the checks above; errors it rejects
+            are raised at once (e.g. to retry a non-idempotent request only
+            when it never reached the server)
         **kwargs: Keyword arguments for func
     
     Returns:
@@ -83,6 +125,8 @@ def run_resiliently(
             # Apply rate limiting delay before each call
             if rate_limit_delay > 0:
                 time.sleep(rate_limit_delay)
+            if rate_limiter is not None:
+                rate_limiter.acquire()
             
             # Execute the function
             result = func(*args, **kwargs)
@@ -101,6 +145,10 @@ def run_resiliently(
             retry_reason = None
             error_str = str(e).lower()
             
+            if retry_if is not None and not retry_if(e):
+                logger.error(f"❌ Non-retryable error: {type(e).__name__}: {str(e)[:200]}")
+                raise
+            
             # Check for quota/rate limit errors (most common in production)
             if any(keyword in error_str for keyword in [
                 'quota', 'rate limit', '429', 'too many requests',
@@ -109,10 +157,11 @@ def run_resiliently(
                 should_retry = True
                 retry_reason = "quota/rate limit"
             
-            # Check for retryable HTTP status codes
-            elif hasattr(e, 'status_code') and e.status_code in retryable_status_codes:
+            # Check for retryable HTTP status codes (requests' HTTPError keeps
+            # the status on its response)
+            elif _status_code(e) in retryable_status_codes:
                 should_retry = True
-                retry_reason = f"HTTP {e.status_code}"
+                retry_reason = f"HTTP {_status_code(e)}"
             
             # Check for network/connection errors
             elif any(isinstance(e, exc_type) for exc_type in retryable_exceptions):
@@ -141,6 +190,13 @@ def run_resiliently(
             
             # Calculate wait time with exponential backoff
             wait_time = min(initial_delay * (backoff_factor ** attempt), max_delay)
+            if jitter > 0:
+                wait_time *= 1 + random.random() * jitter
+            
+            # Honor the server's Retry-After when it asks for a longer wait
+            retry_after = retry_after_seconds(e)
+            if retry_after is not None:
+                wait_time = min(max(wait_time, retry_after), max_delay)
             
             # Log the retry attempt
             logger.warning(
@@ -156,6 +212,36 @@ def run_resiliently(
         raise last_exception
 
 
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status code carried by an exception, if any"""
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        response = getattr(error, 'response', None)
+        status_code = getattr(response, 'status_code', None)
+    return status_code
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Seconds requested by a Retry-After response header, if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    
+    # RFC 7231 also allows an HTTP-date
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None  # Unparseable - fall back to backoff
+
+
 def resilient_api_call(
     max_retries: int = 3,
     initial_delay: float = 1.0,
@@ -200,6 +286,41 @@ def resilient_api_call(
     return decorator
 
 
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+    
+    Allows bursts of up to `capacity` calls and refills at `rate` tokens per
+    second. Unlike a fixed sleep before every call, idle time is banked, so
+    callers only wait when they actually exceed the rate - and the limit
+    holds across threads sharing the bucket.
+    
+    Example:
+        drive_limiter = TokenBucket(rate=10.0)
+        run_resiliently(api_call, rate_limiter=drive_limiter)
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 def rate_limited(calls_per_second: float = 10.0):
     """
     Decorator to rate limit function calls.
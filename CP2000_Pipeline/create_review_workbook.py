@@ -25,7 +25,7 @@ def load_case_data():
         return None
     
     # Get the most recent file
-    latest_file = sorted(json_files, reverse=True)[0]
+    latest_file = max(json_files)
     print(f"📄 Loading case data from: {latest_file}")
     
     with open(latest_file, 'r') as f:
@@ -21,19 +21,106 @@ import shutil
 import time
 import gc
 import re
-from datetime import datetime
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, List, Optional
 import pandas as pd
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload, MediaFileUpload
 from google.oauth2 import service_account
+from google.auth.transport.requests import Request
 
 # Import our existing modules
 from hundred_percent_accuracy_extractor import HundredPercentAccuracyExtractor
 from logics_case_search import LogicsCaseSearcher
 
 # Import robust API utilities (TRA_API pattern)
-from api_utils import run_resiliently, resilient_api_call, rate_limited
+from api_utils import run_resiliently, resilient_api_call, rate_limited, TokenBucket, json_loads, json_dumps
+
+SERVICE_ACCOUNT_FILE = 'service-account-key.json'
+DRIVE_TOKEN_CACHE = '.drive_token.json'
+TOKEN_EXPIRY_MARGIN = 300  # Don't reuse a cached token this close to expiry (seconds)
+DRIVE_DOWNLOAD_CHUNKSIZE = 16 * 1024 * 1024  # Large enough that a CP2000 PDF arrives in one request
+
+# Write-only reports use xlsxwriter's streaming mode when it is installed
+REPORT_EXCEL_ENGINE = 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') else 'openpyxl'
+
+
+def _load_json(path: str):
+    """Read a JSON file, using orjson when available"""
+    with open(path, 'rb') as f:
+        return json_loads(f.read())
+
+
+def _dump_json(data, path: str) -> None:
+    """Write indented UTF-8 JSON, using orjson when available"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json_dumps(data, indent=True))
+
+
+def _write_excel_report(df: pd.DataFrame, path: str, engine: str = REPORT_EXCEL_ENGINE) -> None:
+    """
+    Write a single-sheet report, streaming rows to disk when xlsxwriter is available
+    
+    The xlsxwriter path writes rows itself, top to bottom: constant_memory keeps
+    only the current row, and pandas' to_excel writes column by column, so
+    every earlier row would lose all but its first column.
+    """
+    if engine == 'xlsxwriter':
+        import xlsxwriter
+        
+        wb = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd h:mm:ss'
+        })
+        ws = wb.add_worksheet()
+        ws.write_row(0, 0, [str(name) for name in df.columns], wb.add_format({'bold': True}))
+        for row_num, row in enumerate(df.itertuples(index=False, name=None), start=1):
+            ws.write_row(row_num, 0, [None if pd.isna(value) else value for value in row])
+        wb.close()
+    else:
+        df.to_excel(path, index=False, engine='openpyxl')
+
+
+@lru_cache(maxsize=4)
+def _drive_credentials(key_path: str, key_mtime: float, scopes: tuple):
+    """
+    Service-account credentials with a valid access token.
+    
+    Reuses the access token persisted in DRIVE_TOKEN_CACHE by a previous run
+    when it is still valid, so repeated short runs skip the JWT signing and
+    the OAuth token exchange. Cached per process on the key file's mtime.
+    """
+    creds = service_account.Credentials.from_service_account_file(key_path, scopes=list(scopes))
+    
+    try:
+        with open(DRIVE_TOKEN_CACHE, 'r') as f:
+            cached = json.load(f)
+        expiry = datetime.fromisoformat(cached['expiry'])
+        if (cached.get('key_mtime') == key_mtime and cached.get('scopes') == list(scopes)
+                and (expiry - datetime.now(timezone.utc).replace(tzinfo=None)).total_seconds() > TOKEN_EXPIRY_MARGIN):
+            creds.token = cached['token']
+            creds.expiry = expiry
+            return creds
+    except (OSError, ValueError, KeyError):
+        pass  # No usable cached token - fetch a fresh one
+    
+    creds.refresh(Request())
+    try:
+        fd = os.open(DRIVE_TOKEN_CACHE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({
+                'token': creds.token,
+                'expiry': creds.expiry.isoformat(),
+                'key_mtime': key_mtime,
+                'scopes': list(scopes)
+            }, f)
+    except OSError as e:
+        print(f"   ⚠️  Could not cache Drive token: {e}")
+    return creds
 
 
 class DailyPipelineOrchestrator:
@@ -49,17 +136,27 @@ class DailyPipelineOrchestrator:
         # Google Drive configuration
         self.SCOPES = ['https://www.googleapis.com/auth/drive']
         self.service = None
+        self.creds = None
+        self._local = threading.local()  # Per-thread Drive clients for download workers
         
         # API quota management and rate limiting
         self.api_call_delay = 0.1  # 100ms between API calls (10 calls/sec)
+        self.drive_rate_limiter = TokenBucket(rate=1 / self.api_call_delay)  # Shared by all workers
         self.batch_size = 100  # Process files in batches to manage memory
         self.max_retries = 3  # Retry failed API calls
         self.retry_delay = 2  # Initial retry delay in seconds (exponential backoff)
+        self.upload_workers = 4  # Concurrent Logiqs uploads (each is network-bound)
+        self.download_workers = 4  # Concurrent Drive downloads within a batch
         
         # Processing history for incremental processing
         self.history_file = 'PROCESSING_HISTORY.json'
         self.processed_files = self.load_processing_history()
         
+        # Append-only record of completed Logiqs uploads, so an interrupted
+        # upload run can be resumed without re-uploading finished cases
+        self.upload_checkpoint_file = 'UPLOAD_CHECKPOINT.jsonl'
+        self._checkpoint_lock = threading.Lock()
+        
         # Load test folder IDs if in test mode
         if test_mode and os.path.exists('.test_folders.json'):
             import json
@@ -119,21 +216,29 @@ class DailyPipelineOrchestrator:
         """Load processing history to avoid reprocessing files"""
         if os.path.exists(self.history_file):
             try:
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
+                return _load_json(self.history_file)
             except:
                 return {}
         return {}
     
-    def save_to_history(self, file_id, filename, status):
-        """Save processed file to history"""
+    def save_to_history(self, file_id, filename, status, flush=True):
+        """
+        Save processed file to history
+        
+        Pass flush=False when recording many files in a row and call
+        flush_history() once at the end, instead of rewriting the file per entry.
+        """
         self.processed_files[file_id] = {
             'filename': filename,
             'status': status,
             'processed_at': datetime.now().isoformat()
         }
-        with open(self.history_file, 'w') as f:
-            json.dump(self.processed_files, f, indent=2)
+        if flush:
+            self.flush_history()
+    
+    def flush_history(self):
+        """Write the processing history to disk"""
+        _dump_json(self.processed_files, self.history_file)
     
     def is_already_processed(self, file_id):
         """Check if file was already processed"""
@@ -175,7 +280,7 @@ class DailyPipelineOrchestrator:
             initial_delay=self.retry_delay,
             backoff_factor=2.0,
             max_delay=60.0,
-            rate_limit_delay=self.api_call_delay,
+            rate_limiter=self.drive_rate_limiter,
             **kwargs
         )
     
@@ -184,12 +289,14 @@ class DailyPipelineOrchestrator:
         print("\n🔐 Authenticating with Google Drive...")
         
         try:
-            # Use service account credentials
-            creds = service_account.Credentials.from_service_account_file(
-                'service-account-key.json',
-                scopes=self.SCOPES
+            # Use service account credentials (token reused across runs while valid)
+            creds = _drive_credentials(
+                SERVICE_ACCOUNT_FILE,
+                os.path.getmtime(SERVICE_ACCOUNT_FILE),
+                tuple(self.SCOPES)
             )
             
+            self.creds = creds
             self.service = build('drive', 'v3', credentials=creds)
             print("   ✅ Google Drive authenticated (Service Account)")
             
@@ -250,7 +357,7 @@ class DailyPipelineOrchestrator:
         
         try:
             query = f"'{parent_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false"
-            results = self.service.files().list(q=query, fields="files(id, name)").execute()
+            results = self.service.files().list(q=query, fields="files(id, name)", pageSize=1000).execute()
             folders = results.get('files', [])
             
             for folder in folders:
@@ -282,7 +389,9 @@ class DailyPipelineOrchestrator:
         """
         all_files = []
         page_token = None
-        page_size = 100  # Safe page size (API max is 1000)
+        page_size = 1000  # API max - fewer list calls against the Drive quota
+        if max_results:
+            page_size = min(page_size, max_results)
         
         try:
             while True:
@@ -292,7 +401,7 @@ class DailyPipelineOrchestrator:
                         q=f"'{folder_id}' in parents and mimeType='application/pdf' and trashed=false",
                         pageSize=page_size,
                         pageToken=page_token,
-                        fields="nextPageToken, files(id, name, size)"
+                        fields="nextPageToken, files(id, name)"
                     ).execute()
                 
                 results = self._api_call_with_retry(list_call)
@@ -332,36 +441,32 @@ class DailyPipelineOrchestrator:
             total_batches = (len(files) + self.batch_size - 1) // self.batch_size
             print(f"   📦 Batch {batch_num}/{total_batches}: Processing {len(batch)} files...")
             
-            for i, file in enumerate(batch, 1):
-                try:
-                    local_path = os.path.join(self.temp_dir, file['name'])
-                    
-                    # Download with retry logic
-                    def download_call():
-                        request = self.service.files().get_media(fileId=file['id'])
-                        with open(local_path, 'wb') as f:
-                            downloader = MediaIoBaseDownload(f, request, chunksize=1024*1024)  # 1MB chunks
-                            done = False
-                            while not done:
-                                status, done = downloader.next_chunk()
-                        return True
-                    
-                    self._api_call_with_retry(download_call)
-                    
-                    # Check if already processed (skip in non-test mode)
-                    if not self.test_mode and self.is_already_processed(file['id']):
+            # Skip already-processed files before spending a download on them
+            if not self.test_mode:
+                pending = []
+                for file in batch:
+                    if self.is_already_processed(file['id']):
                         print(f"   ⏭️  Skipping (already processed): {file['name']}")
+                    else:
+                        pending.append(file)
+                batch = pending
+            
+            # Downloads are network-bound, so fetch the batch concurrently;
+            # results come back in listing order
+            with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+                results = executor.map(self._download_drive_file, batch)
+                
+                for file, error in zip(batch, results):
+                    if error is not None:
+                        print(f"   ❌ Error downloading {file['name']}: {self._sanitize_for_log(str(error))}")
                         continue
                     
                     downloaded_files.append({
-                        'local_path': local_path,
+                        'local_path': os.path.join(self.temp_dir, file['name']),
                         'filename': file['name'],
                         'drive_id': file['id'],
                         'source_folder': folder_info['path']
                     })
-                
-                except Exception as e:
-                    print(f"   ❌ Error downloading {file['name']}: {self._sanitize_for_log(str(e))}")
             
             # Force garbage collection after each batch to free memory
             gc.collect()
@@ -370,6 +475,41 @@ class DailyPipelineOrchestrator:
         
         return downloaded_files
     
+    def _thread_drive_service(self):
+        """Drive client for the current thread (googleapiclient is not thread-safe)"""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = build('drive', 'v3', credentials=self.creds)
+            self._local.service = service
+        return service
+    
+    def _download_drive_file(self, file: Dict) -> Optional[Exception]:
+        """
+        Download one Drive file into the temp directory, with retries
+        
+        Args:
+            file (dict): Drive file entry with 'id' and 'name'
+            
+        Returns:
+            Exception or None: The error if the download failed
+        """
+        local_path = os.path.join(self.temp_dir, file['name'])
+        
+        def download_call():
+            request = self._thread_drive_service().files().get_media(fileId=file['id'])
+            with open(local_path, 'wb') as f:
+                downloader = MediaIoBaseDownload(f, request, chunksize=DRIVE_DOWNLOAD_CHUNKSIZE)
+                done = False
+                while not done:
+                    status, done = downloader.next_chunk()
+            return True
+        
+        try:
+            self._api_call_with_retry(download_call)
+            return None
+        except Exception as e:
+            return e
+    
     def download_new_files(self) -> List[str]:
         """Download new files from CP2000 folders only"""
         print("\n📥 STEP 1: DOWNLOADING CP2000 FILES FROM GOOGLE DRIVE")
@@ -718,38 +858,31 @@ class DailyPipelineOrchestrator:
         print("\n📤 UPLOADING MATCHED CASES TO LOGIQS")
         print("=" * 80)
         
-        for i, file_info in enumerate(self.matched_cases, 1):
-            try:
-                case_id = file_info.get('case_id')
-                local_path = file_info.get('local_path')
-                filename = file_info.get('filename')
-                extracted_data = file_info.get('extracted_data', {})
-                
-                print(f"\n{i}/{len(self.matched_cases)} - Uploading to Case {case_id}")
-                print(f"   📄 File: {filename}")
-                
-                # Upload document
-                upload_result = self.logiqs_uploader.upload_to_logiqs(
-                    case_id=case_id,
-                    file_path=local_path,
-                    comment=f"CP2000 Notice - Auto-uploaded {datetime.now().strftime('%Y-%m-%d')}"
-                )
+        # Resume: skip cases a previous (interrupted) run already completed
+        completed = self._load_upload_checkpoint()
+        pending = [c for c in self.matched_cases
+                   if (str(c.get('case_id')), c.get('filename')) not in completed]
+        if len(pending) < len(self.matched_cases):
+            print(f"⏭️  Skipping {len(self.matched_cases) - len(pending)} case(s) already uploaded (from {self.upload_checkpoint_file})")
+        
+        # Same upload date for every case in the run, formatted once
+        self._upload_date = datetime.now().strftime('%Y-%m-%d')
+        
+        # Upload + task creation for each case is independent and I/O-bound, so
+        # run a bounded number of cases at once; results are reported in order
+        with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+            results = executor.map(self._upload_case_to_logiqs, pending)
+            
+            for i, (file_info, upload_result, task_result, error) in enumerate(results, 1):
+                print(f"\n{i}/{len(pending)} - Uploading to Case {file_info.get('case_id')}")
+                print(f"   📄 File: {file_info.get('filename')}")
                 
-                if upload_result.get('success'):
+                if error is not None:
+                    print(f"   ❌ Error: {self._sanitize_for_log(str(error))}")
+                    self.processing_stats['failed'] += 1
+                elif upload_result.get('success'):
                     print(f"   ✅ Document uploaded successfully")
                     
-                    # Create task
-                    notice_date = extracted_data.get('notice_date', 'Unknown')
-                    due_date = extracted_data.get('response_due_date', datetime.now().strftime('%Y-%m-%d'))
-                    
-                    task_result = self.logiqs_uploader.create_task(
-                        case_id=case_id,
-                        subject=f"Review CP2000 Notice - {notice_date}",
-                        due_date=due_date,
-                        comments=f"CP2000 notice uploaded. Response required by {due_date}.",
-                        priority=2  # High priority
-                    )
-                    
                     if task_result.get('success'):
                         print(f"   ✅ Task created (ID: {task_result.get('task_id')})")
                         self.processing_stats['uploaded'] += 1
@@ -758,15 +891,82 @@ class DailyPipelineOrchestrator:
                 else:
                     print(f"   ❌ Upload failed: {upload_result.get('error')}")
                     self.processing_stats['failed'] += 1
-                
-            except Exception as e:
-                print(f"   ❌ Error: {self._sanitize_for_log(str(e))}")
-                self.processing_stats['failed'] += 1
         
         print(f"\n📊 Upload Summary:")
         print(f"   ✅ Uploaded: {self.processing_stats['uploaded']}")
         print(f"   ❌ Failed: {self.processing_stats['failed']}")
     
+    def _load_upload_checkpoint(self) -> set:
+        """(case_id, filename) pairs already uploaded, from the checkpoint file"""
+        completed = set()
+        if not os.path.exists(self.upload_checkpoint_file):
+            return completed
+        
+        with open(self.upload_checkpoint_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json_loads(line)
+                    completed.add((entry['case_id'], entry['filename']))
+                except (ValueError, KeyError):
+                    continue  # Partial line from an interrupted write
+        return completed
+    
+    def _record_upload(self, file_info, task_result):
+        """Append a completed case to the upload checkpoint (called from workers)"""
+        line = json_dumps({
+            'case_id': str(file_info.get('case_id')),
+            'filename': file_info.get('filename'),
+            'task_id': task_result.get('task_id'),
+            'uploaded_at': datetime.now().isoformat()
+        }) + '\n'
+        with self._checkpoint_lock:
+            with open(self.upload_checkpoint_file, 'a', encoding='utf-8') as f:
+                f.write(line)
+    
+    def _upload_case_to_logiqs(self, file_info):
+        """
+        Upload one matched case's document and create its review task
+        
+        Args:
+            file_info (dict): Matched case entry
+            
+        Returns:
+            tuple: (file_info, upload_result, task_result, error)
+        """
+        try:
+            case_id = file_info.get('case_id')
+            extracted_data = file_info.get('extracted_data', {})
+            
+            # Upload document
+            upload_result = self.logiqs_uploader.upload_to_logiqs(
+                case_id=case_id,
+                file_path=file_info.get('local_path'),
+                comment=f"CP2000 Notice - Auto-uploaded {self._upload_date}"
+            )
+            
+            if not upload_result.get('success'):
+                return file_info, upload_result, None, None
+            
+            # Create task
+            notice_date = extracted_data.get('notice_date', 'Unknown')
+            due_date = extracted_data.get('response_due_date', self._upload_date)
+            
+            task_result = self.logiqs_uploader.create_task(
+                case_id=case_id,
+                subject=f"Review CP2000 Notice - {notice_date}",
+                due_date=due_date,
+                comments=f"CP2000 notice uploaded. Response required by {due_date}.",
+                priority=2  # High priority
+            )
+            
+            # Record as soon as the case is done, so an interrupt loses nothing
+            if task_result.get('success'):
+                self._record_upload(file_info, task_result)
+            return file_info, upload_result, task_result, None
+            
+        except Exception as e:
+            return file_info, None, None, e
+    
     def move_files_to_output_folders(self):
         """Move files to appropriate Google Drive folders"""
         print("\n📦 STEP 3: ORGANIZING FILES IN GOOGLE DRIVE")
@@ -899,22 +1099,22 @@ class DailyPipelineOrchestrator:
             
             # Save locally first
             matched_json = os.path.join(self.matched_dir, f'matched_cases_{timestamp}.json')
-            with open(matched_json, 'w', encoding='utf-8') as f:
-                json.dump(matched_report, f, indent=2, ensure_ascii=False)
+            _dump_json(matched_report, matched_json)
             
-            # Excel report for matched
-            matched_df = pd.DataFrame([{
-                'Filename': c['filename'],
-                'Case_ID': c.get('case_id', ''),
-                'Last_Name': c.get('extracted_data', {}).get('last_name', ''),
-                'SSN_Last_4': c.get('extracted_data', {}).get('ssn_last_4', ''),
-                'Tax_Year': c.get('extracted_data', {}).get('tax_year', ''),
-                'Source_Folder': c['source_folder'],
+            # Excel report for matched (built column-wise, no per-row dicts)
+            extracted = [c.get('extracted_data', {}) for c in self.matched_cases]
+            matched_df = pd.DataFrame({
+                'Filename': [c['filename'] for c in self.matched_cases],
+                'Case_ID': [c.get('case_id', '') for c in self.matched_cases],
+                'Last_Name': [e.get('last_name', '') for e in extracted],
+                'SSN_Last_4': [e.get('ssn_last_4', '') for e in extracted],
+                'Tax_Year': [e.get('tax_year', '') for e in extracted],
+                'Source_Folder': [c['source_folder'] for c in self.matched_cases],
                 'Status': 'Ready for Upload'
-            } for c in self.matched_cases])
+            })
             
             matched_excel = os.path.join(self.matched_dir, f'matched_cases_{timestamp}.xlsx')
-            matched_df.to_excel(matched_excel, index=False, engine='openpyxl')
+            _write_excel_report(matched_df, matched_excel)
             
             # Upload to Google Drive
             print(f"   📤 Uploading matched report to {folder_name_matched}...")
@@ -946,22 +1146,22 @@ class DailyPipelineOrchestrator:
             
             # Save locally first
             unmatched_json = os.path.join(self.unmatched_dir, f'unmatched_cases_{timestamp}.json')
-            with open(unmatched_json, 'w', encoding='utf-8') as f:
-                json.dump(unmatched_report, f, indent=2, ensure_ascii=False)
+            _dump_json(unmatched_report, unmatched_json)
             
             # Excel report for unmatched (for manual review)
-            unmatched_df = pd.DataFrame([{
-                'Filename': c['filename'],
-                'Last_Name': c.get('extracted_data', {}).get('last_name', 'N/A'),
-                'SSN_Last_4': c.get('extracted_data', {}).get('ssn_last_4', 'N/A'),
-                'Tax_Year': c.get('extracted_data', {}).get('tax_year', 'N/A'),
-                'Source_Folder': c['source_folder'],
-                'Reason': c.get('reason', 'Unknown'),
+            extracted = [c.get('extracted_data', {}) for c in self.unmatched_cases]
+            unmatched_df = pd.DataFrame({
+                'Filename': [c['filename'] for c in self.unmatched_cases],
+                'Last_Name': [e.get('last_name', 'N/A') for e in extracted],
+                'SSN_Last_4': [e.get('ssn_last_4', 'N/A') for e in extracted],
+                'Tax_Year': [e.get('tax_year', 'N/A') for e in extracted],
+                'Source_Folder': [c['source_folder'] for c in self.unmatched_cases],
+                'Reason': [c.get('reason', 'Unknown') for c in self.unmatched_cases],
                 'Status': 'Needs Manual Review'
-            } for c in self.unmatched_cases])
+            })
             
             unmatched_excel = os.path.join(self.unmatched_dir, f'unmatched_cases_{timestamp}.xlsx')
-            unmatched_df.to_excel(unmatched_excel, index=False, engine='openpyxl')
+            _write_excel_report(unmatched_df, unmatched_excel)
             
             # Upload to Google Drive
             print(f"   📤 Uploading unmatched report to {folder_name_unmatched}...")
@@ -1001,17 +1201,21 @@ class DailyPipelineOrchestrator:
         # IMPROVED: Delete files individually to manage memory better
         if os.path.exists(self.temp_dir):
             try:
-                # Remove files one by one (prevents memory spikes with large files)
-                for file in os.listdir(self.temp_dir):
-                    try:
-                        file_path = os.path.join(self.temp_dir, file)
-                        if os.path.isfile(file_path):
-                            os.remove(file_path)  # Securely delete temp files
-                    except Exception as e:
-                        print(f"   ⚠️  Could not remove {file}: {str(e)}")
+                # Remove files one by one (prevents memory spikes with large files);
+                # scandir reports the file type without an extra stat per entry
+                with os.scandir(self.temp_dir) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_file():
+                                os.unlink(entry.path)  # Securely delete temp files
+                        except Exception as e:
+                            print(f"   ⚠️  Could not remove {entry.name}: {str(e)}")
                 
-                # Remove directory
-                shutil.rmtree(self.temp_dir)
+                # Remove directory - normally empty by now, so skip the rmtree walk
+                try:
+                    os.rmdir(self.temp_dir)
+                except OSError:
+                    shutil.rmtree(self.temp_dir)
                 print("   ✅ Temporary PDF files deleted (secure cleanup)")
             except Exception as e:
                 print(f"   ⚠️  Error during cleanup: {str(e)}")
@@ -1114,8 +1318,10 @@ class DailyPipelineOrchestrator:
                     self.save_to_history(
                         file_info['drive_id'],
                         file_info['filename'],
-                        file_info.get('status', 'pending_review')
+                        file_info.get('status', 'pending_review'),
+                        flush=False
                     )
+                self.flush_history()
                 
                 return
             
@@ -1134,8 +1340,10 @@ class DailyPipelineOrchestrator:
                 self.save_to_history(
                     file_info['drive_id'],
                     file_info['filename'],
-                    file_info.get('status', 'processed')
+                    file_info.get('status', 'processed'),
+                    flush=False
                 )
+            self.flush_history()
             
             # Step 10: Cleanup
             self.cleanup()
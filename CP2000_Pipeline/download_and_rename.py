@@ -14,19 +14,33 @@ OUTPUT:
 """
 
 import os
-import json
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from google.auth.transport.requests import AuthorizedSession
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
+
+from api_utils import json_loads, json_dumps
+
 
 class GoogleDriveDownloader:
     """Download and rename PDFs from Google Drive"""
     
     def __init__(self):
         self.SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
-        self.service = None
+        self.creds = None
+        self.http = None
+        self._local = threading.local()
+        
+        # filename -> (file_info, folder_name) for every file in the folders,
+        # built once with a paginated listing instead of one query per file
+        self._name_index = None
+        self._index_lock = threading.Lock()
+        
+        # Concurrent Drive find + download workers
+        self.max_workers = 8
         
         # Google Drive folder
         self.folders = {
@@ -44,12 +58,16 @@ class GoogleDriveDownloader:
         print("🔐 Authenticating with Google Drive...")
         
         try:
-            creds = service_account.Credentials.from_service_account_file(
+            self.creds = service_account.Credentials.from_service_account_file(
                 'service-account-key.json',
                 scopes=self.SCOPES
             )
             
-            self.service = build('drive', 'v3', credentials=creds)
+            # Client for the main thread; worker threads build their own
+            self._local.service = build('drive', 'v3', credentials=self.creds)
+            
+            # Authorized requests session for streaming media downloads
+            self.http = AuthorizedSession(self.creds)
             print("   ✅ Authenticated successfully (Service Account)")
             
         except FileNotFoundError:
@@ -60,65 +78,119 @@ class GoogleDriveDownloader:
             print(f"   ❌ Authentication error: {str(e)}")
             raise
     
+    @property
+    def service(self):
+        """Drive client for the current thread (googleapiclient is not thread-safe)"""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = build('drive', 'v3', credentials=self.creds)
+            self._local.service = service
+        return service
+    
     def load_upload_list(self):
         """Load the upload list with naming convention"""
         print("\n📂 Loading upload list...")
         
-        # Find the latest upload list JSON file
-        upload_files = [f for f in os.listdir('UPLOAD_READY') if f.startswith('upload_list_') and f.endswith('.json')]
+        # Find the latest upload list JSON file in a single pass
+        with os.scandir('UPLOAD_READY') as entries:
+            latest_file = max(
+                (e.name for e in entries if e.name.startswith('upload_list_') and e.name.endswith('.json')),
+                default=None
+            )
         
-        if not upload_files:
+        if latest_file is None:
             print("   ❌ No upload list found!")
             print("   💡 Please run: python generate_upload_list.py first")
             return False
         
-        # Get most recent
-        latest_file = sorted(upload_files)[-1]
         file_path = os.path.join('UPLOAD_READY', latest_file)
         
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        with open(file_path, 'rb') as f:
+            data = json_loads(f.read())
         
         self.upload_list = data['upload_list']
         print(f"   ✅ Loaded {len(self.upload_list)} files from {latest_file}")
         return True
     
+    def _build_name_index(self):
+        """List every file in the Drive folders once and index it by name"""
+        folder_names = {folder_id: folder_name for folder_name, folder_id in self.folders.items()}
+        parents = ' or '.join(f"'{folder_id}' in parents" for folder_id in folder_names)
+        query = f"({parents}) and trashed=false"
+        
+        index = {}
+        page_token = None
+        while True:
+            results = self.service.files().list(
+                q=query,
+                fields="nextPageToken, files(id, name, parents)",
+                pageSize=1000,
+                pageToken=page_token
+            ).execute()
+            
+            for file_info in results.get('files', []):
+                folder_name = next(
+                    (folder_names[p] for p in file_info.get('parents', []) if p in folder_names),
+                    None
+                )
+                # Keep the first match, as the per-file query did
+                index.setdefault(file_info['name'], (file_info, folder_name))
+            
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+        
+        print(f"   📇 Indexed {len(index)} files in Google Drive")
+        return index
+    
+    def prefetch_drive_index(self):
+        """Build the Drive name index once; safe to call from any thread"""
+        if self._name_index is None:
+            with self._index_lock:
+                if self._name_index is None:
+                    try:
+                        self._name_index = self._build_name_index()
+                    except Exception as e:
+                        print(f"   ❌ Error listing Google Drive folders: {str(e)}")
+                        return False
+        return True
+    
     def find_file_in_drive(self, filename):
         """Find a file in Google Drive across all folders"""
-        for folder_name, folder_id in self.folders.items():
-            try:
-                # Search for file in this folder
-                query = f"name='{filename}' and '{folder_id}' in parents and trashed=false"
-                results = self.service.files().list(
-                    q=query,
-                    fields="files(id, name)",
-                    pageSize=1
-                ).execute()
-                
-                files = results.get('files', [])
-                if files:
-                    return files[0], folder_name
-            except Exception as e:
-                continue
+        if not self.prefetch_drive_index():
+            return None, None
         
-        return None, None
+        return self._name_index.get(filename, (None, None))
     
     def download_file(self, file_id, output_path):
         """Download a file from Google Drive"""
         try:
-            request = self.service.files().get_media(fileId=file_id)
+            # One streamed GET instead of a Range request per 100 KB chunk
+            url = self.service.files().get_media(fileId=file_id).uri
             
-            with open(output_path, 'wb') as f:
-                downloader = MediaIoBaseDownload(f, request)
-                done = False
-                while not done:
-                    status, done = downloader.next_chunk()
+            with self.http.get(url, stream=True, timeout=120) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                with open(output_path, 'wb') as f:
+                    shutil.copyfileobj(response.raw, f, length=1 << 20)
             
             return True
         except Exception as e:
             print(f"      ❌ Download error: {str(e)}")
             return False
     
+    def _fetch_entry(self, entry):
+        """Find one upload-list entry in Drive and download it under its new name"""
+        file_info, folder = self.find_file_in_drive(entry['Old_Filename'])
+        
+        if not file_info:
+            return entry, None, None, False
+        
+        # Download with new name
+        output_path = os.path.join(self.output_dir, entry['New_Filename'])
+        ok = self.download_file(file_info['id'], output_path)
+        return entry, file_info, folder, ok
+    
     def download_and_rename_all(self):
         """Download all files and rename them"""
         print(f"\n🚀 Downloading and renaming {len(self.upload_list)} files...")
@@ -134,47 +206,48 @@ class GoogleDriveDownloader:
         
         os.makedirs(self.output_dir)
         
+        # List the Drive folders once before the workers start looking files up
+        self.prefetch_drive_index()
+        
         # Statistics
         downloaded = 0
         renamed = 0
         not_found = []
         errors = []
         
-        # Process each file
-        for idx, entry in enumerate(self.upload_list, 1):
-            old_filename = entry['Old_Filename']
-            new_filename = entry['New_Filename']
-            case_id = entry['Case_ID']
-            last_name = entry['Last_Name']
-            
-            # Progress
-            if idx % 10 == 0:
-                print(f"\n📊 Progress: {idx}/{len(self.upload_list)} ({idx/len(self.upload_list)*100:.1f}%)")
-            
-            print(f"\n{idx:3d}. {last_name:15s} (Case: {case_id})")
-            print(f"     Old: {old_filename[:60]}")
-            print(f"     New: {new_filename}")
-            
-            # Find file in Drive
-            file_info, folder = self.find_file_in_drive(old_filename)
-            
-            if not file_info:
-                print(f"     ❌ Not found in Google Drive")
-                not_found.append(entry)
-                continue
+        # Find and download files concurrently - each is an independent
+        # network-bound Drive round-trip; results are reported in list order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = executor.map(self._fetch_entry, self.upload_list)
             
-            print(f"     📁 Found in: {folder}")
-            
-            # Download with new name
-            output_path = os.path.join(self.output_dir, new_filename)
-            
-            if self.download_file(file_info['id'], output_path):
-                print(f"     ✅ Downloaded and renamed")
-                downloaded += 1
-                renamed += 1
-            else:
-                print(f"     ❌ Download failed")
-                errors.append(entry)
+            for idx, (entry, file_info, folder, ok) in enumerate(results, 1):
+                old_filename = entry['Old_Filename']
+                new_filename = entry['New_Filename']
+                case_id = entry['Case_ID']
+                last_name = entry['Last_Name']
+                
+                # Progress
+                if idx % 10 == 0:
+                    print(f"\n📊 Progress: {idx}/{len(self.upload_list)} ({idx/len(self.upload_list)*100:.1f}%)")
+                
+                print(f"\n{idx:3d}. {last_name:15s} (Case: {case_id})")
+                print(f"     Old: {old_filename[:60]}")
+                print(f"     New: {new_filename}")
+                
+                if not file_info:
+                    print(f"     ❌ Not found in Google Drive")
+                    not_found.append(entry)
+                    continue
+                
+                print(f"     📁 Found in: {folder}")
+                
+                if ok:
+                    print(f"     ✅ Downloaded and renamed")
+                    downloaded += 1
+                    renamed += 1
+                else:
+                    print(f"     ❌ Download failed")
+                    errors.append(entry)
         
         # Summary
         print("\n" + "=" * 80)
@@ -198,8 +271,8 @@ class GoogleDriveDownloader:
         }
         
         results_file = os.path.join(self.output_dir, 'download_results.json')
-        with open(results_file, 'w') as f:
-            json.dump(results, f, indent=2)
+        with open(results_file, 'w', encoding='utf-8') as f:
+            f.write(json_dumps(results, indent=True))
         
         print(f"\n💾 Results saved to: {results_file}")
         
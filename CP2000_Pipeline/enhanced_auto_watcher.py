@@ -16,6 +16,7 @@ USAGE:
     python3 enhanced_auto_watcher.py <spreadsheet_id> --once
 """
 
+import io
 import os
 import sys
 import time
@@ -26,6 +27,7 @@ from pathlib import Path
 from typing import List, Dict, Optional
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
+from googleapiclient.http import MediaIoBaseDownload
 
 # Import your existing modules
 from hundred_percent_accuracy_extractor import HundredPercentAccuracyExtractor
@@ -195,10 +197,7 @@ class EnhancedAutoWatcher:
             # Save to temp folder
             local_path = os.path.join(self.temp_download_folder, file_name)
             
-            import io
             fh = io.FileIO(local_path, 'wb')
-            
-            from googleapiclient.http import MediaIoBaseDownload
             downloader = MediaIoBaseDownload(fh, request)
             
             done = False
@@ -6,10 +6,17 @@ from typing import Dict, Optional
 import requests
 import time
 
+from api_utils import json_loads
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _parse_json(response):
+    """Decode a JSON response body, using orjson when available"""
+    return json_loads(response.content)
+
+
 class LogicsCaseSearcher:
     def __init__(self, max_retries: int = 3, retry_delay: float = 2.0):
         # Use the API key for TI Parser
@@ -95,7 +102,8 @@ class LogicsCaseSearcher:
                 if 'tax_year' in file_info:
                     params['taxYear'] = file_info['tax_year']
             
-            logger.debug(f"   Request Parameters: {json.dumps(params, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"   Request Parameters: {json.dumps(params, indent=2)}")
             
             # Make the POST request to the case match endpoint
             response = self._make_request_with_retry('POST', self.match_endpoint, json=params)
@@ -103,8 +111,9 @@ class LogicsCaseSearcher:
             if response:
                 try:
                     # Parse the response
-                    data = response.json()
-                    logger.debug(f"   Response Data: {json.dumps(data, indent=2)}")
+                    data = _parse_json(response)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"   Response Data: {json.dumps(data, indent=2)}")
                     
                     if isinstance(data, dict):
                         # Check if match was found
@@ -177,7 +186,7 @@ class LogicsCaseSearcher:
             
             if response:
                 try:
-                    data = response.json()
+                    data = _parse_json(response)
                     
                     # Check if response has expected structure
                     if isinstance(data, dict):
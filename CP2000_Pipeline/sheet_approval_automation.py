@@ -6,26 +6,67 @@ Monitors Google Sheet for approved cases and automatically:
 """
 
 import os
-import json
 import time
+import atexit
 import logging
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
 from typing import List, Dict, Optional
+from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
 import requests
+from requests.adapters import HTTPAdapter
+
+from api_utils import json_loads, json_dumps
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:  # Optional; without it requests buffers the multipart body
+    MultipartEncoder = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Refresh the OAuth token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = 300
+
+# Seconds a cached directory listing stays valid in _find_document
+DIR_LISTING_TTL = 30
+
+# Fallback recursive search limits for _find_document
+SEARCH_MAX_DEPTH = 4
+SEARCH_SKIP_DIRS = {'.git', 'venv', '__pycache__', 'node_modules', '.tox'}
+
+# Pre-serialized Logics task body; string fields are filled in JSON-encoded
+TASK_PAYLOAD_TEMPLATE = (
+    '{{"caseId": {case_id}, "taskType": "CP2000_REVIEW", "priority": "HIGH", '
+    '"dueDate": {task_due}, "title": {title}, "description": {description}, '
+    '"details": {{"taxYear": {tax_year}, "noticeDate": {notice_date}, '
+    '"dueDate": {due_date}, "noticeType": {letter_type}, '
+    '"status": "NEW", "source": "Automated Pipeline"}}}}'
+)
+
 
 class SheetApprovalAutomation:
     """Automates task creation and document upload when cases are approved in Google Sheet"""
     
-    def __init__(self, credentials_path: str = 'token.json'):
+    def __init__(self, credentials_path: str = 'token.json', state_file: str = 'approval_state.json',
+                 max_workers: int = 4):
         """Initialize with Google credentials and Logics API"""
         try:
+            # Approved cases are processed concurrently; Logics calls are network-bound
+            self.max_workers = max_workers
+            
+            # Rows already processed survive restarts via the state file
+            self.state_file = state_file
+            self.processed_rows = self._load_processed_rows()
+            
+            # Cached directory listings: path -> (time listed, set of names)
+            self._dir_listings = {}
+            
             # Google Services - Use OAuth credentials
             self.credentials = Credentials.from_authorized_user_file(
                 credentials_path,
@@ -35,8 +76,25 @@ class SheetApprovalAutomation:
                 ]
             )
             
-            self.sheets_service = build('sheets', 'v4', credentials=self.credentials)
-            self.drive_service = build('drive', 'v3', credentials=self.credentials)
+            # Use the discovery documents bundled with google-api-python-client
+            # instead of fetching them over the network on every start
+            self.sheets_service = build('sheets', 'v4', credentials=self.credentials,
+                                        cache_discovery=False, static_discovery=True)
+            self.drive_service = build('drive', 'v3', credentials=self.credentials,
+                                       cache_discovery=False, static_discovery=True)
+            
+            # googleapiclient/httplib2 objects are not thread-safe
+            self._sheets_lock = threading.Lock()
+            
+            # Refresh the token in the background so API calls rarely block on
+            # it; google-auth still refreshes on demand in before_request if a
+            # call finds the token expired
+            self._stop_refresher = threading.Event()
+            self._refresher = threading.Thread(
+                target=self._token_refresh_loop, name='token-refresher', daemon=True
+            )
+            self._refresher.start()
+            atexit.register(self._stop_refresher.set)
             
             # Logics API Configuration
             self.api_key = os.environ.get('LOGICS_API_KEY', "sk_BIWGmwZeahwOyI9ytZNMnZmM_mY1SOcpl4OXlmFpJvA")
@@ -46,76 +104,223 @@ class SheetApprovalAutomation:
                 "X-API-Key": self.api_key
             }
             
+            # Pooled keep-alive connections to Logics, sized for the worker pool
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            self.session.mount('https://', adapter)
+            
             logger.info("✅ Automation system initialized successfully")
             
         except Exception as e:
             logger.error(f"❌ Failed to initialize automation: {str(e)}")
             raise
     
-    def monitor_sheet(self, spreadsheet_id: str, check_interval: int = 60):
+    def _load_processed_rows(self) -> set:
+        """Load processed (row, case ID) keys from the state file"""
+        if not os.path.exists(self.state_file):
+            return set()
+        
+        try:
+            with open(self.state_file, 'rb') as f:
+                raw = f.read()
+            state = json_loads(raw)
+            return {tuple(key) for key in state.get('processed_rows', [])}
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load state file {self.state_file}: {str(e)}")
+            return set()
+    
+    def _save_processed_rows(self):
+        """Atomically rewrite the state file with the processed row keys"""
+        state = {
+            'processed_rows': sorted(self.processed_rows),
+            'last_update': datetime.now().isoformat()
+        }
+        tmp_file = f"{self.state_file}.tmp"
+        
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(json_dumps(state, indent=True))
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            logger.error(f"❌ Failed to save state file: {str(e)}")
+    
+    def _token_refresh_loop(self):
+        """Refresh OAuth credentials shortly before they expire"""
+        while not self._stop_refresher.is_set():
+            expiry = self.credentials.expiry
+            if expiry is None:
+                wait = TOKEN_REFRESH_MARGIN
+            else:
+                # google-auth stores expiry as a naive UTC datetime
+                now = datetime.now(timezone.utc).replace(tzinfo=None)
+                wait = (expiry - now).total_seconds() - TOKEN_REFRESH_MARGIN
+            
+            if wait > 0 and self._stop_refresher.wait(wait):
+                break
+            
+            if not self.credentials.refresh_token:
+                logger.debug("No refresh token available; skipping pre-emptive refresh")
+                self._stop_refresher.wait(TOKEN_REFRESH_MARGIN)
+                continue
+            
+            try:
+                self.credentials.refresh(Request())
+                logger.debug(f"OAuth token refreshed, new expiry: {self.credentials.expiry}")
+            except Exception as e:
+                logger.warning(f"⚠️ Background token refresh failed: {str(e)}")
+                self._stop_refresher.wait(60)
+    
+    def monitor_sheet(self, spreadsheet_id: str, check_interval: int = 60,
+                      min_interval: int = 10, max_interval: int = 600,
+                      idle_polls_before_backoff: int = 3):
         """
         Monitor Google Sheet for approved cases and process them
         
+        The poll interval adapts to activity: after `idle_polls_before_backoff`
+        consecutive checks with no new approvals it doubles (up to
+        `max_interval`), and as soon as an approval is found it drops to
+        `min_interval` so the rest of a batch is picked up quickly.
+        
         Args:
             spreadsheet_id: ID of the Google Sheet to monitor
-            check_interval: Seconds between checks (default 60)
+            check_interval: Initial seconds between checks (default 60)
+            min_interval: Fast interval used right after approvals (default 10)
+            max_interval: Upper bound for the idle back-off (default 600)
+            idle_polls_before_backoff: Idle checks before backing off (default 3)
         """
         logger.info(f"🔍 Starting to monitor sheet: {spreadsheet_id}")
-        logger.info(f"⏱️ Check interval: {check_interval} seconds")
+        logger.info(f"⏱️ Check interval: {check_interval} seconds "
+                    f"(adaptive {min_interval}-{max_interval}s)")
         
-        processed_rows = set()  # Track processed rows to avoid duplicates
+        processed_rows = self.processed_rows  # Track processed rows to avoid duplicates
+        self._interval = check_interval
+        self._idle_streak = 0
         
         while True:
+            found = 0
             try:
-                # Read sheet data - starting from row 8 (after headers and instructions)
-                result = self.sheets_service.spreadsheets().values().get(
-                    spreadsheetId=spreadsheet_id,
-                    range='Matched Cases!A8:M1000'  # Start from row 8 (first data row)
-                ).execute()
+                # Locate approved rows first, then fetch only those rows in full
+                approved = self._read_approved_rows(spreadsheet_id)
+                self._mark_rows_processing(spreadsheet_id, [idx for idx, _ in approved])
                 
-                values = result.get('values', [])
+                found = len(approved)
                 
-                if not values:
-                    logger.info("No data found in sheet")
-                    time.sleep(check_interval)
-                    continue
-                
-                # Process each row
-                for idx, row in enumerate(values, start=8):  # Start at row 8 (first data row)
-                    if len(row) < 12:  # Minimum required columns (need at least up to Status column)
-                        continue
-                    
-                    row_key = f"{idx}_{row[0] if len(row) > 0 else ''}"  # Row index + Case ID
-                    
-                    # Check if this row was already processed
-                    if row_key in processed_rows:
-                        continue
+                for idx, row, success in self._process_rows(approved, spreadsheet_id):
+                    row_key = (idx, row[0])  # Row index + Case ID
                     
-                    # Status is at column index 11 (column L)
-                    status = row[11] if len(row) > 11 else ''
-                    
-                    # Process if approved
-                    if status.strip().upper() == 'APPROVE':
-                        logger.info(f"\n{'='*60}")
-                        logger.info(f"✅ APPROVED case found in row {idx}")
-                        
-                        success = self._process_approved_case(row, idx, spreadsheet_id)
-                        
-                        if success:
-                            processed_rows.add(row_key)
-                            logger.info(f"✅ Successfully processed row {idx}")
-                        else:
-                            logger.error(f"❌ Failed to process row {idx}")
+                    if success:
+                        processed_rows.add(row_key)
+                        self._save_processed_rows()
+                        logger.info(f"✅ Successfully processed row {idx}")
+                    else:
+                        logger.error(f"❌ Failed to process row {idx}")
                 
                 logger.info(f"✓ Check completed at {datetime.now().strftime('%H:%M:%S')}")
-                time.sleep(check_interval)
+                self._adjust_interval(found, min_interval, max_interval,
+                                      idle_polls_before_backoff)
+                time.sleep(self._interval)
                 
             except KeyboardInterrupt:
                 logger.info("\n⏹️ Monitoring stopped by user")
                 break
             except Exception as e:
                 logger.error(f"❌ Error during monitoring: {str(e)}")
-                time.sleep(check_interval)
+                time.sleep(self._interval)
+    
+    def _read_approved_rows(self, spreadsheet_id: str, first_row: int = 8,
+                            last_row: int = 1000, batch_size: int = 100) -> List[tuple]:
+        """
+        Read only the approved, not-yet-processed rows from the sheet
+        
+        The Case ID (A) and Status/Notes (L:M) columns are fetched first to
+        locate candidate rows; full row data is then fetched for those rows only.
+        
+        Args:
+            spreadsheet_id: ID of the Google Sheet
+            first_row: First data row (default 8, after headers and instructions)
+            last_row: Last row to scan (default 1000)
+            batch_size: Maximum row ranges per batchGet request
+            
+        Returns:
+            List of (row_number, row) tuples ready for processing
+        """
+        values = self.sheets_service.spreadsheets().values()
+        result = values.batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=[f'Matched Cases!A{first_row}:A{last_row}',
+                    f'Matched Cases!L{first_row}:M{last_row}'],
+            majorDimension='COLUMNS'
+        ).execute()
+        
+        value_ranges = result.get('valueRanges', [])
+        id_columns = value_ranges[0].get('values', []) if value_ranges else []
+        status_columns = value_ranges[1].get('values', []) if len(value_ranges) > 1 else []
+        
+        case_ids = id_columns[0] if id_columns else []
+        statuses = status_columns[0] if status_columns else []
+        notes = status_columns[1] if len(status_columns) > 1 else []
+        
+        row_numbers = self._approved_row_numbers(case_ids, statuses, notes, first_row)
+        
+        approved = []
+        for i in range(0, len(row_numbers), batch_size):
+            chunk = row_numbers[i:i + batch_size]
+            result = values.batchGet(
+                spreadsheetId=spreadsheet_id,
+                ranges=[f'Matched Cases!A{idx}:M{idx}' for idx in chunk]
+            ).execute()
+            
+            for idx, value_range in zip(chunk, result.get('valueRanges', [])):
+                rows = value_range.get('values', [])
+                if rows:
+                    approved.append((idx, rows[0]))
+        
+        return approved
+    
+    def _approved_row_numbers(self, case_ids: List[str], statuses: List[str],
+                              notes: List[str], start: int = 8) -> List[int]:
+        """
+        Filter column data down to approved rows in a single pass
+        
+        Args:
+            case_ids: Case ID column values (column A)
+            statuses: Status column values (column L)
+            notes: Notes column values (column M)
+            start: Sheet row number of the first entry
+            
+        Returns:
+            Row numbers whose Status is APPROVE, whose Notes do not already record
+            a completed run, and which are not in processed_rows
+        """
+        approved = []
+        for offset, status in enumerate(statuses):
+            if status.strip().upper() != 'APPROVE':
+                continue
+            if offset < len(notes) and notes[offset].startswith('✅ Completed'):
+                continue
+            
+            idx = start + offset
+            case_id = case_ids[offset] if offset < len(case_ids) else ''
+            if (idx, case_id) not in self.processed_rows:
+                approved.append(idx)
+        
+        return approved
+    
+    def _adjust_interval(self, found: int, min_interval: int, max_interval: int,
+                         idle_polls_before_backoff: int):
+        """Back off the poll interval while idle, reset it on new approvals"""
+        previous = self._interval
+        
+        if found:
+            self._idle_streak = 0
+            self._interval = min_interval
+        else:
+            self._idle_streak += 1
+            if self._idle_streak >= idle_polls_before_backoff:
+                self._interval = min(max_interval, self._interval * 2)
+        
+        if self._interval != previous:
+            logger.debug(f"Poll interval changed: {previous}s -> {self._interval}s")
     
     def process_single_check(self, spreadsheet_id: str) -> int:
         """
@@ -130,36 +335,18 @@ class SheetApprovalAutomation:
         processed_count = 0
         
         try:
-            # Read sheet data - starting from row 8 (after headers and instructions)
-            result = self.sheets_service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range='Matched Cases!A8:M1000'
-            ).execute()
-            
-            values = result.get('values', [])
+            # Locate approved rows first, then fetch only those rows in full
+            approved = self._read_approved_rows(spreadsheet_id)
+            self._mark_rows_processing(spreadsheet_id, [idx for idx, _ in approved])
             
-            if not values:
-                logger.info("No data found in sheet")
-                return 0
-            
-            # Process each row
-            for idx, row in enumerate(values, start=8):
-                if len(row) < 12:  # Need at least up to Status column
-                    continue
-                
-                # Status is at column index 11
-                status = row[11] if len(row) > 11 else ''
+            for idx, row, success in self._process_rows(approved, spreadsheet_id):
+                row_key = (idx, row[0])  # Row index + Case ID
                 
-                # Process if approved
-                if status.strip().upper() == 'APPROVE':
-                    logger.info(f"\n{'='*60}")
-                    logger.info(f"✅ Processing approved case in row {idx}")
-                    
-                    success = self._process_approved_case(row, idx, spreadsheet_id)
-                    
-                    if success:
-                        processed_count += 1
-                        logger.info(f"✅ Successfully processed row {idx}")
+                if success:
+                    processed_count += 1
+                    self.processed_rows.add(row_key)
+                    self._save_processed_rows()
+                    logger.info(f"✅ Successfully processed row {idx}")
             
             logger.info(f"\n📊 Processed {processed_count} approved cases")
             return processed_count
@@ -168,6 +355,32 @@ class SheetApprovalAutomation:
             logger.error(f"❌ Error during processing: {str(e)}")
             return processed_count
     
+    def _process_rows(self, approved: List[tuple], spreadsheet_id: str):
+        """
+        Process approved rows concurrently on a thread pool
+        
+        Args:
+            approved: List of (row_number, row) tuples
+            spreadsheet_id: ID of the Google Sheet
+            
+        Yields:
+            (row_number, row, success) tuples as cases complete
+        """
+        if not approved:
+            return
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {}
+            for idx, row in approved:
+                logger.info(f"\n{'='*60}")
+                logger.info(f"✅ APPROVED case found in row {idx}")
+                future = executor.submit(self._process_approved_case, row, idx, spreadsheet_id)
+                futures[future] = (idx, row)
+            
+            for future in as_completed(futures):
+                idx, row = futures[future]
+                yield idx, row, future.result()
+    
     def _process_approved_case(self, row: List, row_idx: int, spreadsheet_id: str) -> bool:
         """Process a single approved case"""
         try:
@@ -184,16 +397,13 @@ class SheetApprovalAutomation:
             due_date = row[8] if len(row) > 8 else ''
             letter_type = row[5] if len(row) > 5 else 'CP2000'
             
-            logger.info(f"📋 Case Details:")
-            logger.info(f"   Case ID: {case_id}")
-            logger.info(f"   Name: {taxpayer_name}")
-            logger.info(f"   File: {original_filename}")
-            logger.info(f"   Tax Year: {tax_year}")
-            logger.info(f"   Notice Date: {notice_date}")
-            logger.info(f"   Due Date: {due_date}")
-            
-            # Update Notes column with status
-            self._update_cell_status(spreadsheet_id, row_idx, 'M', 'Processing...')
+            logger.info("📋 Case Details:")
+            logger.info("   Case ID: %s", case_id)
+            logger.info("   Name: %s", taxpayer_name)
+            logger.info("   File: %s", original_filename)
+            logger.info("   Tax Year: %s", tax_year)
+            logger.info("   Notice Date: %s", notice_date)
+            logger.info("   Due Date: %s", due_date)
             
             # Step 1: Create task in Logics
             logger.info("📝 Creating task in Logics...")
@@ -219,7 +429,7 @@ class SheetApprovalAutomation:
                 return True  # Still consider it successful since task was created
             
         except Exception as e:
-            logger.error(f"❌ Error processing case: {str(e)}")
+            logger.error("❌ Error processing case: %s", e)
             try:
                 self._update_cell_status(spreadsheet_id, row_idx, 'M', f'❌ Error: {str(e)[:40]}')
             except:
@@ -232,37 +442,34 @@ class SheetApprovalAutomation:
         try:
             url = f"{self.base_url}/tasks/create"
             
-            payload = {
-                'caseId': int(case_id),
-                'taskType': 'CP2000_REVIEW',
-                'priority': 'HIGH',
-                'dueDate': due_date or notice_date,
-                'title': f'{letter_type} Notice Review - Tax Year {tax_year}',
-                'description': f'Review and respond to {letter_type} notice. Notice Date: {notice_date}, Due Date: {due_date}',
-                'details': {
-                    'taxYear': tax_year,
-                    'noticeDate': notice_date,
-                    'dueDate': due_date,
-                    'noticeType': letter_type,
-                    'status': 'NEW',
-                    'source': 'Automated Pipeline'
-                }
-            }
+            dumps = json_dumps
+            body = TASK_PAYLOAD_TEMPLATE.format(
+                case_id=int(case_id),
+                task_due=dumps(due_date or notice_date),
+                title=dumps(f'{letter_type} Notice Review - Tax Year {tax_year}'),
+                description=dumps(f'Review and respond to {letter_type} notice. '
+                                  f'Notice Date: {notice_date}, Due Date: {due_date}'),
+                tax_year=dumps(tax_year),
+                notice_date=dumps(notice_date),
+                due_date=dumps(due_date),
+                letter_type=dumps(letter_type)
+            )
             
-            logger.debug(f"Task payload: {json.dumps(payload, indent=2)}")
+            logger.debug("Task payload: %s", body)
             
-            response = requests.post(url, headers=self.headers, json=payload, timeout=30)
+            # self.headers already carries Content-Type: application/json
+            response = self.session.post(url, headers=self.headers, data=body.encode('utf-8'), timeout=30)
             
             if response.status_code in [200, 201]:
-                logger.info(f"✅ Task created successfully for Case {case_id}")
-                logger.debug(f"Response: {response.text}")
+                logger.info("✅ Task created successfully for Case %s", case_id)
+                logger.debug("Response: %s", response.text)
                 return True
             else:
-                logger.error(f"❌ Task creation failed: {response.status_code} - {response.text}")
+                logger.error("❌ Task creation failed: %s - %s", response.status_code, response.text)
                 return False
                 
         except Exception as e:
-            logger.error(f"❌ Error creating task: {str(e)}")
+            logger.error("❌ Error creating task: %s", e)
             return False
     
     def _upload_document(self, case_id: str, filename: str, tax_year: str) -> bool:
@@ -272,19 +479,17 @@ class SheetApprovalAutomation:
             file_path = self._find_document(filename)
             
             if not file_path:
-                logger.error(f"❌ Document not found: {filename}")
-                logger.info(f"   Searched for: {filename}")
+                logger.error("❌ Document not found: %s", filename)
+                logger.info("   Searched for: %s", filename)
                 return False
             
-            logger.info(f"📁 Found document at: {file_path}")
+            logger.info("📁 Found document at: %s", file_path)
             
             url = f"{self.base_url}/documents/upload"
             
             # Prepare multipart upload
             with open(file_path, 'rb') as file:
-                files = {
-                    'file': (os.path.basename(file_path), file, 'application/pdf')
-                }
+                file_field = (os.path.basename(file_path), file, 'application/pdf')
                 
                 data = {
                     'caseId': str(case_id),
@@ -297,27 +502,34 @@ class SheetApprovalAutomation:
                 # Note: Remove Content-Type header for multipart/form-data
                 headers = {"X-API-Key": self.api_key}
                 
-                logger.debug(f"Upload data: {data}")
-                logger.debug(f"File size: {os.path.getsize(file_path)} bytes")
+                logger.debug("Upload data: %s", data)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("File size: %d bytes", os.path.getsize(file_path))
                 
-                response = requests.post(
-                    url,
-                    headers=headers,
-                    data=data,
-                    files=files,
-                    timeout=60
-                )
+                if MultipartEncoder is not None:
+                    # Stream the body from disk instead of assembling it in memory
+                    encoder = MultipartEncoder(fields={**data, 'file': file_field})
+                    headers['Content-Type'] = encoder.content_type
+                    response = self.session.post(url, headers=headers, data=encoder, timeout=60)
+                else:
+                    response = self.session.post(
+                        url,
+                        headers=headers,
+                        data=data,
+                        files={'file': file_field},
+                        timeout=60
+                    )
             
             if response.status_code in [200, 201]:
-                logger.info(f"✅ Document uploaded successfully for Case {case_id}")
-                logger.debug(f"Response: {response.text}")
+                logger.info("✅ Document uploaded successfully for Case %s", case_id)
+                logger.debug("Response: %s", response.text)
                 return True
             else:
-                logger.error(f"❌ Document upload failed: {response.status_code} - {response.text}")
+                logger.error("❌ Document upload failed: %s - %s", response.status_code, response.text)
                 return False
                 
         except Exception as e:
-            logger.error(f"❌ Error uploading document: {str(e)}")
+            logger.error("❌ Error uploading document: %s", e)
             import traceback
             logger.debug(traceback.format_exc())
             return False
@@ -335,38 +547,84 @@ class SheetApprovalAutomation:
         ]
         
         for path in search_paths:
-            full_path = os.path.join(path, filename)
-            if os.path.exists(full_path):
-                logger.info(f"📁 Found document: {full_path}")
+            if filename in self._list_dir(path):
+                full_path = os.path.join(path, filename)
+                logger.info("📁 Found document: %s", full_path)
                 return os.path.abspath(full_path)
         
         # Try recursive search in current directory
-        logger.info(f"🔍 Trying recursive search for: {filename}")
-        for root, dirs, files in os.walk('.'):
+        logger.info("🔍 Trying recursive search for: %s", filename)
+        base_depth = os.path.abspath('.').count(os.sep)
+        for root, dirs, files in os.walk('.', followlinks=False):
+            # Prune hidden/tooling directories and stop descending past the depth limit
+            if os.path.abspath(root).count(os.sep) - base_depth >= SEARCH_MAX_DEPTH:
+                dirs[:] = []
+            else:
+                dirs[:] = [d for d in dirs if d not in SEARCH_SKIP_DIRS and not d.startswith('.')]
+            
             if filename in files:
                 full_path = os.path.join(root, filename)
-                logger.info(f"📁 Found document via recursive search: {full_path}")
+                logger.info("📁 Found document via recursive search: %s", full_path)
                 return os.path.abspath(full_path)
         
         return None
     
+    def _list_dir(self, path: str) -> set:
+        """Return the file names in a directory, cached for DIR_LISTING_TTL seconds"""
+        now = time.monotonic()
+        cached = self._dir_listings.get(path)
+        if cached and now - cached[0] < DIR_LISTING_TTL:
+            return cached[1]
+        
+        try:
+            with os.scandir(path) as entries:
+                names = {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            names = set()
+        
+        self._dir_listings[path] = (now, names)
+        return names
+    
+    def _mark_rows_processing(self, spreadsheet_id: str, row_indices: List[int]):
+        """Set the Notes column of all pending rows to 'Processing...' in one request"""
+        if not row_indices:
+            return
+        
+        try:
+            data = [
+                {'range': f"Matched Cases!M{idx}", 'values': [['Processing...']]}
+                for idx in row_indices
+            ]
+            
+            with self._sheets_lock:
+                self.sheets_service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=spreadsheet_id,
+                    body={'valueInputOption': 'RAW', 'data': data}
+                ).execute()
+            
+            logger.debug("Marked %d row(s) as processing", len(row_indices))
+            
+        except Exception as e:
+            logger.error("❌ Failed to update cells: %s", e)
+    
     def _update_cell_status(self, spreadsheet_id: str, row_idx: int, 
                            column: str, value: str):
         """Update a specific cell in the sheet"""
         try:
             range_name = f"Matched Cases!{column}{row_idx}"
             
-            self.sheets_service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range=range_name,
-                valueInputOption='RAW',
-                body={'values': [[value]]}
-            ).execute()
+            with self._sheets_lock:
+                self.sheets_service.spreadsheets().values().update(
+                    spreadsheetId=spreadsheet_id,
+                    range=range_name,
+                    valueInputOption='RAW',
+                    body={'values': [[value]]}
+                ).execute()
             
-            logger.debug(f"Updated {range_name} = {value}")
+            logger.debug("Updated %s = %s", range_name, value)
             
         except Exception as e:
-            logger.error(f"❌ Failed to update cell: {str(e)}")
+            logger.error("❌ Failed to update cell: %s", e)
 
 
 def main():
@@ -7,45 +7,55 @@ Verifies all components are working correctly
 import os
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from importlib.util import find_spec
 
-def test_imports():
-    """Test that all required modules can be imported"""
-    print("="*70)
-    print("TEST 1: Checking imports...")
-    print("="*70)
-    
+
+def module_available(name: str) -> bool:
+    """Check that a module can be imported without executing it"""
     try:
-        from hundred_percent_accuracy_extractor import HundredPercentAccuracyExtractor
-        print("✅ HundredPercentAccuracyExtractor imported")
-    except Exception as e:
-        print(f"❌ Failed to import HundredPercentAccuracyExtractor: {e}")
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
+        # Raised when a parent package is missing
         return False
+
+
+# Each test returns (passed, lines) - the lines it would print - so the tests
+# can run concurrently and still report in a stable order
+def test_imports():
+    """Test that all required modules can be imported"""
+    lines = []
+    lines.append("="*70)
+    lines.append("TEST 1: Checking imports...")
+    lines.append("="*70)
     
-    try:
-        from logics_case_search import LogicsCaseSearcher
-        print("✅ LogicsCaseSearcher imported")
-    except Exception as e:
-        print(f"❌ Failed to import LogicsCaseSearcher: {e}")
-        return False
+    # Only locate modules here; importing the Google API clients and the
+    # extractor (OpenCV/PyMuPDF) just to check availability is slow
+    modules = [
+        ('hundred_percent_accuracy_extractor', 'HundredPercentAccuracyExtractor'),
+        ('logics_case_search', 'LogicsCaseSearcher'),
+        ('google.oauth2.credentials', 'Google OAuth credentials'),
+        ('googleapiclient.discovery', 'Google API client'),
+    ]
     
-    try:
-        from google.oauth2.credentials import Credentials
-        from googleapiclient.discovery import build
-        print("✅ Google API libraries imported")
-    except Exception as e:
-        print(f"❌ Failed to import Google libraries: {e}")
-        return False
+    for module, label in modules:
+        if module_available(module):
+            lines.append(f"✅ {label} available")
+        else:
+            lines.append(f"❌ {label} not found ({module})")
+            return False, lines
     
-    print("\n✅ All imports successful!\n")
-    return True
+    lines.append("\n✅ All imports successful!\n")
+    return True, lines
 
 
 def test_files_exist():
     """Test that all required files exist"""
-    print("="*70)
-    print("TEST 2: Checking required files...")
-    print("="*70)
+    lines = []
+    lines.append("="*70)
+    lines.append("TEST 2: Checking required files...")
+    lines.append("="*70)
     
     required_files = [
         'enhanced_auto_watcher.py',
@@ -61,44 +71,50 @@ def test_files_exist():
         'QUICK_REFERENCE.txt'
     ]
     
+    # One directory scan instead of a stat per file
+    with os.scandir('.') as entries:
+        present = {entry.name for entry in entries}
+    
     all_exist = True
     for file in required_files:
-        if os.path.exists(file):
-            print(f"✅ {file}")
+        if file in present:
+            lines.append(f"✅ {file}")
         else:
-            print(f"❌ {file} NOT FOUND")
+            lines.append(f"❌ {file} NOT FOUND")
             all_exist = False
     
     if all_exist:
-        print("\n✅ All required files exist!\n")
+        lines.append("\n✅ All required files exist!\n")
     else:
-        print("\n❌ Some files are missing!\n")
+        lines.append("\n❌ Some files are missing!\n")
     
-    return all_exist
+    return all_exist, lines
 
 
 def test_credentials():
     """Test that credentials file exists"""
-    print("="*70)
-    print("TEST 3: Checking credentials...")
-    print("="*70)
+    lines = []
+    lines.append("="*70)
+    lines.append("TEST 3: Checking credentials...")
+    lines.append("="*70)
     
     if os.path.exists('token.json'):
-        print("✅ token.json exists")
-        print("\n✅ Credentials ready!\n")
-        return True
+        lines.append("✅ token.json exists")
+        lines.append("\n✅ Credentials ready!\n")
+        return True, lines
     else:
-        print("❌ token.json NOT FOUND")
-        print("   Run create_review_workbook.py first to generate credentials")
-        print()
-        return False
+        lines.append("❌ token.json NOT FOUND")
+        lines.append("   Run create_review_workbook.py first to generate credentials")
+        lines.append('')
+        return False, lines
 
 
 def test_folders():
     """Test that monitored folders exist"""
-    print("="*70)
-    print("TEST 4: Checking monitored folders...")
-    print("="*70)
+    lines = []
+    lines.append("="*70)
+    lines.append("TEST 4: Checking monitored folders...")
+    lines.append("="*70)
     
     folders = [
         'CP2000',
@@ -109,24 +125,25 @@ def test_folders():
     for folder in folders:
         if os.path.exists(folder):
             files = [f for f in os.listdir(folder) if f.endswith('.pdf')]
-            print(f"✅ {folder}/ ({len(files)} PDF files)")
+            lines.append(f"✅ {folder}/ ({len(files)} PDF files)")
             found_count += 1
         else:
-            print(f"⚠️  {folder}/ not found (will skip)")
+            lines.append(f"⚠️  {folder}/ not found (will skip)")
     
     if found_count > 0:
-        print(f"\n✅ Found {found_count} monitored folder(s)!\n")
-        return True
+        lines.append(f"\n✅ Found {found_count} monitored folder(s)!\n")
+        return True, lines
     else:
-        print("\n⚠️  No monitored folders found (create them if needed)\n")
-        return False
+        lines.append("\n⚠️  No monitored folders found (create them if needed)\n")
+        return False, lines
 
 
 def test_state_file():
     """Test state file operations"""
-    print("="*70)
-    print("TEST 5: Testing state file operations...")
-    print("="*70)
+    lines = []
+    lines.append("="*70)
+    lines.append("TEST 5: Testing state file operations...")
+    lines.append("="*70)
     
     test_file = 'test_state.json'
     
@@ -140,39 +157,40 @@ def test_state_file():
         # Write
         with open(test_file, 'w') as f:
             json.dump(state, f, indent=2)
-        print("✅ State file write successful")
+        lines.append("✅ State file write successful")
         
         # Read
         with open(test_file, 'r') as f:
             loaded = json.load(f)
-        print("✅ State file read successful")
+        lines.append("✅ State file read successful")
         
         # Verify
         if loaded['processed_files'] == state['processed_files']:
-            print("✅ State file data verified")
+            lines.append("✅ State file data verified")
         else:
-            print("❌ State file data mismatch")
-            return False
+            lines.append("❌ State file data mismatch")
+            return False, lines
         
         # Cleanup
         os.remove(test_file)
-        print("✅ State file cleanup successful")
+        lines.append("✅ State file cleanup successful")
         
-        print("\n✅ State file operations working!\n")
-        return True
+        lines.append("\n✅ State file operations working!\n")
+        return True, lines
         
     except Exception as e:
-        print(f"❌ State file test failed: {e}\n")
+        lines.append(f"❌ State file test failed: {e}\n")
         if os.path.exists(test_file):
             os.remove(test_file)
-        return False
+        return False, lines
 
 
 def test_sheet_structure():
     """Test that review workbook has correct structure"""
-    print("="*70)
-    print("TEST 6: Verifying sheet structure...")
-    print("="*70)
+    lines = []
+    lines.append("="*70)
+    lines.append("TEST 6: Verifying sheet structure...")
+    lines.append("="*70)
     
     expected_headers = [
         'Case_ID',
@@ -191,13 +209,13 @@ def test_sheet_structure():
         'Processed_Timestamp'  # NEW!
     ]
     
-    print(f"Expected columns: {len(expected_headers)}")
+    lines.append(f"Expected columns: {len(expected_headers)}")
     for i, header in enumerate(expected_headers, 1):
         symbol = "⭐" if header == 'Processed_Timestamp' else "✅"
-        print(f"{symbol} Column {i}: {header}")
+        lines.append(f"{symbol} Column {i}: {header}")
     
-    print("\n✅ Sheet structure verified!\n")
-    return True
+    lines.append("\n✅ Sheet structure verified!\n")
+    return True, lines
 
 
 def print_usage_guide():
@@ -229,15 +247,24 @@ def main():
     print("╚═══════════════════════════════════════════════════════════════╝")
     print()
     
-    results = []
+    tests = [
+        ("Imports", test_imports),
+        ("File Existence", test_files_exist),
+        ("Credentials", test_credentials),
+        ("Folders", test_folders),
+        ("State Operations", test_state_file),
+        ("Sheet Structure", test_sheet_structure),
+    ]
     
-    # Run all tests
-    results.append(("Imports", test_imports()))
-    results.append(("File Existence", test_files_exist()))
-    results.append(("Credentials", test_credentials()))
-    results.append(("Folders", test_folders()))
-    results.append(("State Operations", test_state_file()))
-    results.append(("Sheet Structure", test_sheet_structure()))
+    # Run all tests concurrently - they share no state. Each returns the
+    # lines it would print, which are printed here in declaration order
+    with ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        futures = [(name, executor.submit(test)) for name, test in tests]
+        results = []
+        for name, future in futures:
+            passed, lines = future.result()
+            print("\n".join(lines))
+            results.append((name, passed))
     
     # Print summary
     print("="*70)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Round-trip check for the orchestrator's Excel reports
+Writes a report with every available engine and reads it back
+"""
+
+import os
+import sys
+import tempfile
+from importlib.util import find_spec
+
+import pandas as pd
+
+from daily_pipeline_orchestrator import _write_excel_report
+
+
+def sample_report() -> pd.DataFrame:
+    """A small report shaped like the matched/unmatched reports"""
+    return pd.DataFrame({
+        'Case_ID': [101, 102, 103],
+        'Filename': ['a.pdf', 'b.pdf', 'c.pdf'],
+        'SSN_Last_4': ['1234', None, '9012'],
+        'Status': 'Ready for Upload'
+    })
+
+
+def check_engine(engine: str) -> bool:
+    """Write the sample report with one engine and compare what comes back"""
+    expected = sample_report()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f'report_{engine}.xlsx')
+        _write_excel_report(expected, path, engine=engine)
+        actual = pd.read_excel(path, dtype={'SSN_Last_4': str})
+
+    try:
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    except AssertionError as e:
+        print(f"❌ {engine}: report did not round-trip\n{e}")
+        return False
+
+    print(f"✅ {engine}: {len(actual)} rows x {len(actual.columns)} columns read back intact")
+    return True
+
+
+def main():
+    engines = [engine for engine in ('openpyxl', 'xlsxwriter') if find_spec(engine)]
+    if not engines:
+        print("⚠️  Neither openpyxl nor xlsxwriter is installed")
+        return 1
+
+    results = [check_engine(engine) for engine in engines]
+    return 0 if all(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,203 +5,234 @@ Author: Hemalatha Yalamanchi
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+import base64
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import json
 
 load_dotenv()
 api_key = os.getenv('LOGICS_API_KEY')
 
-print("=" * 80)
-print("🔍 LOGICS API AUTHENTICATION TEST")
-print("=" * 80)
-print(f"\n✅ API Key loaded: {api_key[:10]}...{api_key[-4:]}")
+# Response headers/bodies are only dumped at LOG_LEVEL=DEBUG
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), format='%(message)s')
+log = logging.getLogger(__name__)
+
+log.info("=" * 80)
+log.info("🔍 LOGICS API AUTHENTICATION TEST")
+log.info("=" * 80)
+log.info(f"\n✅ API Key loaded: {api_key[:10]}...{api_key[-4:]}")
 
 base_url = "https://tiparser-dev.onrender.com/case-data/api"
+
+# One keep-alive session for all probes - they all hit the same host
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0))
+
+# Basic auth header (API key as username, empty password), computed once
+basic_auth_header = "Basic " + base64.b64encode(f"{api_key}:".encode('utf-8')).decode('utf-8')
+
 test_payload = {
     "ssn_last_4": "1234",
     "last_name": "TEST"
 }
 
-print(f"\n📍 Testing endpoint: {base_url}/case/match")
-print(f"📦 Test payload: {test_payload}")
-
-# Test 1: X-API-Key header (current method)
-print("\n" + "=" * 80)
-print("1️⃣  Testing: X-API-Key header (current method)")
-print("=" * 80)
-try:
-    headers = {
-        "X-API-Key": api_key,
-        "Content-Type": "application/json"
-    }
-    response = requests.post(
-        f"{base_url}/case/match",
-        headers=headers,
-        json=test_payload,
-        timeout=10
-    )
-    print(f"   Status Code: {response.status_code}")
-    print(f"   Response Headers: {dict(response.headers)}")
-    print(f"   Response Body: {response.text[:500]}")
-    if response.status_code == 200:
-        print("   ✅ SUCCESS - This authentication method works!")
-except Exception as e:
-    print(f"   ❌ Error: {str(e)}")
-
-# Test 2: Authorization Bearer token
-print("\n" + "=" * 80)
-print("2️⃣  Testing: Authorization Bearer token")
-print("=" * 80)
-try:
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    response = requests.post(
-        f"{base_url}/case/match",
-        headers=headers,
-        json=test_payload,
-        timeout=10
-    )
-    print(f"   Status Code: {response.status_code}")
-    print(f"   Response Headers: {dict(response.headers)}")
-    print(f"   Response Body: {response.text[:500]}")
-    if response.status_code == 200:
-        print("   ✅ SUCCESS - This authentication method works!")
-except Exception as e:
-    print(f"   ❌ Error: {str(e)}")
-
-# Test 3: API key in query parameters
-print("\n" + "=" * 80)
-print("3️⃣  Testing: API key in query parameters")
-print("=" * 80)
-try:
-    headers = {
-        "Content-Type": "application/json"
-    }
-    response = requests.post(
-        f"{base_url}/case/match?apikey={api_key}",
-        headers=headers,
-        json=test_payload,
-        timeout=10
-    )
-    print(f"   Status Code: {response.status_code}")
-    print(f"   Response Headers: {dict(response.headers)}")
-    print(f"   Response Body: {response.text[:500]}")
-    if response.status_code == 200:
-        print("   ✅ SUCCESS - This authentication method works!")
-except Exception as e:
-    print(f"   ❌ Error: {str(e)}")
-
-# Test 4: API key in query parameters (alternate key name)
-print("\n" + "=" * 80)
-print("4️⃣  Testing: API key in query parameters (api_key)")
-print("=" * 80)
-try:
-    headers = {
-        "Content-Type": "application/json"
-    }
-    response = requests.post(
-        f"{base_url}/case/match?api_key={api_key}",
-        headers=headers,
-        json=test_payload,
-        timeout=10
-    )
-    print(f"   Status Code: {response.status_code}")
-    print(f"   Response Headers: {dict(response.headers)}")
-    print(f"   Response Body: {response.text[:500]}")
-    if response.status_code == 200:
-        print("   ✅ SUCCESS - This authentication method works!")
-except Exception as e:
-    print(f"   ❌ Error: {str(e)}")
-
-# Test 5: Basic Authentication
-print("\n" + "=" * 80)
-print("5️⃣  Testing: Basic Authentication")
-print("=" * 80)
-try:
-    import base64
-    credentials = f"{api_key}:".encode('utf-8')
-    b64_credentials = base64.b64encode(credentials).decode('utf-8')
-    headers = {
-        "Authorization": f"Basic {b64_credentials}",
-        "Content-Type": "application/json"
-    }
-    response = requests.post(
-        f"{base_url}/case/match",
-        headers=headers,
-        json=test_payload,
-        timeout=10
-    )
-    print(f"   Status Code: {response.status_code}")
-    print(f"   Response Headers: {dict(response.headers)}")
-    print(f"   Response Body: {response.text[:500]}")
+# Per-probe header sets, built once
+JSON_HEADERS = {"Content-Type": "application/json"}
+API_KEY_HEADERS = {"X-API-Key": api_key}
+X_API_KEY_HEADERS = {**JSON_HEADERS, **API_KEY_HEADERS}
+BEARER_HEADERS = {**JSON_HEADERS, "Authorization": f"Bearer {api_key}"}
+BASIC_AUTH_HEADERS = {**JSON_HEADERS, "Authorization": basic_auth_header}
+
+log.info(f"\n📍 Testing endpoint: {base_url}/case/match")
+log.info(f"📦 Test payload: {test_payload}")
+
+
+def banner(title):
+    """Section header lines for a probe"""
+    return ["\n" + "=" * 80, title, "=" * 80]
+
+
+def body_preview(response, limit):
+    """First `limit` bytes of the body, decoded without charset detection on the whole body"""
+    return response.content[:limit].decode('utf-8', errors='replace')
+
+
+def describe_response(response, success_message, show_headers=True):
+    """Status (and, at DEBUG, header/body) lines for a probe response"""
+    lines = [f"   Status Code: {response.status_code}"]
+    if log.isEnabledFor(logging.DEBUG):
+        if show_headers:
+            lines.append(f"   Content-Type: {response.headers.get('content-type')}")
+            lines.append(f"   WWW-Authenticate: {response.headers.get('www-authenticate')}")
+            lines.append(f"   Response Body: {body_preview(response, 500)}")
+        else:
+            lines.append(f"   Response: {body_preview(response, 500)}")
     if response.status_code == 200:
-        print("   ✅ SUCCESS - This authentication method works!")
-except Exception as e:
-    print(f"   ❌ Error: {str(e)}")
-
-# Test 6: Check health/status endpoint
-print("\n" + "=" * 80)
-print("6️⃣  Testing: Health/Status endpoint")
-print("=" * 80)
-for endpoint in ["/health", "/status", "/"]:
+        lines.append(success_message)
+    return lines
+
+
+# Each probe returns the lines it would print, so probes can run
+# concurrently and still be reported in order
+
+def probe_x_api_key(session):
+    """Test 1: X-API-Key header (current method)"""
+    lines = banner("1️⃣  Testing: X-API-Key header (current method)")
     try:
-        print(f"\n   Trying: {base_url}{endpoint}")
-        headers = {"X-API-Key": api_key}
-        response = requests.get(
-            f"{base_url}{endpoint}",
-            headers=headers,
+        response = session.post(
+            f"{base_url}/case/match",
+            headers=X_API_KEY_HEADERS,
+            json=test_payload,
             timeout=10
         )
-        print(f"   Status Code: {response.status_code}")
-        print(f"   Response: {response.text[:200]}")
-        if response.status_code == 200:
-            print(f"   ✅ Endpoint {endpoint} is accessible!")
+        lines += describe_response(response, "   ✅ SUCCESS - This authentication method works!")
     except Exception as e:
-        print(f"   ❌ Error: {str(e)}")
-
-# Test 7: Check if server is even reachable
-print("\n" + "=" * 80)
-print("7️⃣  Testing: Server reachability (no auth)")
-print("=" * 80)
-try:
-    response = requests.get(
-        "https://tiparser-dev.onrender.com",
-        timeout=10
-    )
-    print(f"   Status Code: {response.status_code}")
-    print(f"   Server is reachable: ✅")
-except Exception as e:
-    print(f"   ❌ Server unreachable: {str(e)}")
-
-# Test 8: Try GET instead of POST
-print("\n" + "=" * 80)
-print("8️⃣  Testing: GET request (instead of POST)")
-print("=" * 80)
-try:
-    headers = {
-        "X-API-Key": api_key,
-        "Content-Type": "application/json"
-    }
-    response = requests.get(
-        f"{base_url}/case/match",
-        headers=headers,
-        params=test_payload,
-        timeout=10
-    )
-    print(f"   Status Code: {response.status_code}")
-    print(f"   Response: {response.text[:500]}")
-    if response.status_code == 200:
-        print("   ✅ SUCCESS - GET method works!")
-except Exception as e:
-    print(f"   ❌ Error: {str(e)}")
-
-print("\n" + "=" * 80)
-print("🎯 SUMMARY")
-print("=" * 80)
-print("""
+        lines.append(f"   ❌ Error: {str(e)}")
+    return lines
+
+
+def probe_bearer(session):
+    """Test 2: Authorization Bearer token"""
+    lines = banner("2️⃣  Testing: Authorization Bearer token")
+    try:
+        response = session.post(
+            f"{base_url}/case/match",
+            headers=BEARER_HEADERS,
+            json=test_payload,
+            timeout=10
+        )
+        lines += describe_response(response, "   ✅ SUCCESS - This authentication method works!")
+    except Exception as e:
+        lines.append(f"   ❌ Error: {str(e)}")
+    return lines
+
+
+def probe_query_apikey(session):
+    """Test 3: API key in query parameters"""
+    lines = banner("3️⃣  Testing: API key in query parameters")
+    try:
+        response = session.post(
+            f"{base_url}/case/match?apikey={api_key}",
+            headers=JSON_HEADERS,
+            json=test_payload,
+            timeout=10
+        )
+        lines += describe_response(response, "   ✅ SUCCESS - This authentication method works!")
+    except Exception as e:
+        lines.append(f"   ❌ Error: {str(e)}")
+    return lines
+
+
+def probe_query_api_key(session):
+    """Test 4: API key in query parameters (alternate key name)"""
+    lines = banner("4️⃣  Testing: API key in query parameters (api_key)")
+    try:
+        response = session.post(
+            f"{base_url}/case/match?api_key={api_key}",
+            headers=JSON_HEADERS,
+            json=test_payload,
+            timeout=10
+        )
+        lines += describe_response(response, "   ✅ SUCCESS - This authentication method works!")
+    except Exception as e:
+        lines.append(f"   ❌ Error: {str(e)}")
+    return lines
+
+
+def probe_basic_auth(session):
+    """Test 5: Basic Authentication"""
+    lines = banner("5️⃣  Testing: Basic Authentication")
+    try:
+        response = session.post(
+            f"{base_url}/case/match",
+            headers=BASIC_AUTH_HEADERS,
+            json=test_payload,
+            timeout=10
+        )
+        lines += describe_response(response, "   ✅ SUCCESS - This authentication method works!")
+    except Exception as e:
+        lines.append(f"   ❌ Error: {str(e)}")
+    return lines
+
+
+def probe_health(session):
+    """Test 6: Check health/status endpoint"""
+    lines = banner("6️⃣  Testing: Health/Status endpoint")
+    for endpoint in ["/health", "/status", "/"]:
+        try:
+            lines.append(f"\n   Trying: {base_url}{endpoint}")
+            response = session.get(
+                f"{base_url}{endpoint}",
+                headers=API_KEY_HEADERS,
+                timeout=10
+            )
+            lines.append(f"   Status Code: {response.status_code}")
+            if log.isEnabledFor(logging.DEBUG):
+                lines.append(f"   Response: {body_preview(response, 200)}")
+            if response.status_code == 200:
+                lines.append(f"   ✅ Endpoint {endpoint} is accessible!")
+                break
+        except Exception as e:
+            lines.append(f"   ❌ Error: {str(e)}")
+    return lines
+
+
+def probe_reachability(session):
+    """Test 7: Check if server is even reachable"""
+    lines = banner("7️⃣  Testing: Server reachability (no auth)")
+    try:
+        response = session.get(
+            "https://tiparser-dev.onrender.com",
+            timeout=10
+        )
+        lines.append(f"   Status Code: {response.status_code}")
+        lines.append(f"   Server is reachable: ✅")
+    except Exception as e:
+        lines.append(f"   ❌ Server unreachable: {str(e)}")
+    return lines
+
+
+def probe_get(session):
+    """Test 8: Try GET instead of POST"""
+    lines = banner("8️⃣  Testing: GET request (instead of POST)")
+    try:
+        response = session.get(
+            f"{base_url}/case/match",
+            headers=X_API_KEY_HEADERS,
+            params=test_payload,
+            timeout=10
+        )
+        lines += describe_response(response, "   ✅ SUCCESS - GET method works!", show_headers=False)
+    except Exception as e:
+        lines.append(f"   ❌ Error: {str(e)}")
+    return lines
+
+
+probes = [
+    probe_x_api_key,
+    probe_bearer,
+    probe_query_apikey,
+    probe_query_api_key,
+    probe_basic_auth,
+    probe_health,
+    probe_reachability,
+    probe_get,
+]
+
+# The probes are independent and network-bound, so run them all at once
+with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+    results = list(executor.map(lambda probe: probe(session), probes))
+
+for lines in results:
+    log.info("\n".join(lines))
+
+log.info("\n" + "=" * 80)
+log.info("🎯 SUMMARY")
+log.info("=" * 80)
+log.info("""
 Review the results above to identify which authentication method returned:
 - ✅ 200 (Success)
 - ⚠️  401 (Unauthorized - wrong auth method)
@@ -217,4 +248,3 @@ Next steps:
    - Account has proper permissions
 3. If all returned 404, the endpoint URL might be incorrect
 """)
-
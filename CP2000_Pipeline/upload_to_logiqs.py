@@ -5,17 +5,61 @@ Module for uploading documents and tasks to Logiqs
 import os
 import logging
 import requests
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
 from typing import Optional, Dict
+from dotenv import load_dotenv
+
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:  # Optional; without it requests buffers the multipart body
+    MultipartEncoder = None
+
+from api_utils import run_resiliently, TokenBucket
 
 logger = logging.getLogger(__name__)
 
+# Transient failures worth retrying; 4xx auth errors are not retried
+RETRYABLE_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+RETRYABLE_STATUS_CODES = [429, 500, 502, 503, 504]
+
+# (connect, read) timeouts in seconds, so a stalled connection raises a
+# retryable Timeout instead of hanging an upload worker
+LOGICS_TIMEOUT = (10, 60)
+
+# Request budget for the Logics API, shared by every uploader in the process
+LOGICS_RATE_LIMITER = TokenBucket(rate=5.0)
+
+
+DEFAULT_LOGICS_BASE_URL = "https://tiparser-dev.onrender.com/case-data/api"
+
+
+def _never_sent(error: Exception) -> bool:
+    """Whether a failed request could not have been applied by the server"""
+    # ReadTimeout is not a ConnectionError; ConnectTimeout is both
+    return isinstance(error, requests.exceptions.ConnectionError)
+
+
+@lru_cache(maxsize=1)
+def _load_env() -> Dict[str, Optional[str]]:
+    """Parse .env once per process and snapshot the Logics settings"""
+    load_dotenv()
+    return {
+        'LOGICS_API_KEY': os.environ.get('LOGICS_API_KEY'),
+        'LOGICS_BASE_URL': os.environ.get('LOGICS_BASE_URL', DEFAULT_LOGICS_BASE_URL)
+    }
+
+
 class LogiqsDocumentUploader:
     """Class for uploading documents and tasks to Logiqs"""
     
     def __init__(self):
         # Set API config
-        self.api_key = "sk_BIWGmwZeahwOyI9ytZNMnZmM_mY1SOcpl4OXlmFpJvA"
-        self.base_url = "https://tiparser-dev.onrender.com/case-data/api"
+        env = _load_env()
+        self.api_key = env['LOGICS_API_KEY']
+        if not self.api_key:
+            raise ValueError("LOGICS_API_KEY is not set - add it to your .env file (see env.example)")
+        self.base_url = env['LOGICS_BASE_URL'].rstrip('/')
         
         # Set up headers
         self.headers = {
@@ -23,8 +67,167 @@ class LogiqsDocumentUploader:
             "X-API-Key": self.api_key
         }
         
+        # Pooled keep-alive session; transient failures are retried by
+        # _request_with_retry with exponential backoff and jitter, and
+        # requests are paced by LOGICS_RATE_LIMITER
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=10))
+        
         logger.info("✅ Document uploader initialized")
     
+    def close(self):
+        """Release the pooled keep-alive connections"""
+        self.session.close()
+    
+    def _request_with_retry(self, method: str, url: str, file_path: Optional[str] = None,
+                            idempotent: bool = True, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying transient failures with backoff and jitter
+        
+        Args:
+            method (str): HTTP method
+            url (str): Endpoint URL
+            file_path (str): PDF to attach as multipart 'file', re-opened on
+                every attempt so a retry sends the full body
+            idempotent (bool): False for requests that create something. A
+                5xx or timeout may arrive after the server applied the request,
+                so those are retried only on connection errors.
+            **kwargs: Extra arguments for requests
+            
+        Returns:
+            requests.Response: Successful response
+        """
+        kwargs.setdefault('timeout', LOGICS_TIMEOUT)
+        
+        def attempt():
+            if file_path is None:
+                response = self.session.request(method, url, **kwargs)
+            else:
+                with open(file_path, 'rb') as f:
+                    response = self._send_multipart(method, url, f, file_path, **kwargs)
+            response.raise_for_status()
+            return response
+        
+        return run_resiliently(
+            attempt,
+            max_retries=3,
+            initial_delay=1.0,
+            max_delay=30.0,
+            jitter=0.5,
+            rate_limiter=LOGICS_RATE_LIMITER,
+            retryable_exceptions=RETRYABLE_EXCEPTIONS,
+            retryable_status_codes=RETRYABLE_STATUS_CODES,
+            retry_if=None if idempotent else _never_sent
+        )
+    
+    def _send_multipart(self, method: str, url: str, f, file_path: str,
+                        headers: Optional[Dict] = None, data: Optional[Dict] = None,
+                        **kwargs) -> requests.Response:
+        """Send form fields plus the open PDF as multipart/form-data"""
+        # Multipart needs its own Content-Type (with boundary), not the JSON one
+        headers = {k: v for k, v in (headers or {}).items() if k.lower() != 'content-type'}
+        file_field = (os.path.basename(file_path), f, 'application/pdf')
+        
+        if MultipartEncoder is None:
+            return self.session.request(method, url, headers=headers, data=data,
+                                        files={'file': file_field}, **kwargs)
+        
+        # Stream the body from disk instead of assembling it in memory
+        fields = {k: str(v) for k, v in (data or {}).items()}
+        fields['file'] = file_field
+        encoder = MultipartEncoder(fields=fields)
+        headers['Content-Type'] = encoder.content_type
+        return self.session.request(method, url, headers=headers, data=encoder, **kwargs)
+    
+    def upload_to_logiqs(self, case_id: str, file_path: str, comment: Optional[str] = None,
+                         document_type: str = 'CP2000', tax_year: Optional[str] = None) -> Dict:
+        """
+        Upload a document to a Logiqs case
+        
+        Args:
+            case_id (str): Case ID to upload to
+            file_path (str): Path to document file
+            comment (str): Optional description shown on the document
+            document_type (str): Type of document (default CP2000)
+            tax_year (str): Optional tax year for document
+            
+        Returns:
+            dict: {'success': bool, 'error': str or None}
+        """
+        if not os.path.exists(file_path):
+            logger.error(f"File not found: {file_path}")
+            return {'success': False, 'error': f"File not found: {file_path}"}
+        
+        data = {
+            'caseId': case_id,
+            'documentType': document_type
+        }
+        if tax_year:
+            data['taxYear'] = tax_year
+        if comment:
+            data['description'] = comment
+        
+        try:
+            self._request_with_retry(
+                'POST',
+                f"{self.base_url}/documents/upload",
+                file_path=file_path,
+                idempotent=False,
+                headers=self.headers,
+                data=data
+            )
+        except Exception as e:
+            logger.error(f"Failed to upload document: {str(e)}")
+            return {'success': False, 'error': str(e)}
+        
+        logger.info(f"✅ Document uploaded for Case {case_id}")
+        return {'success': True, 'error': None}
+    
+    def create_task(self, case_id: str, subject: str, due_date: str,
+                    comments: str = '', priority: int = 2) -> Dict:
+        """
+        Create a review task on a Logiqs case
+        
+        Args:
+            case_id (str): Case ID to create task for
+            subject (str): Task title
+            due_date (str): Due date (YYYY-MM-DD)
+            comments (str): Task description
+            priority (int): Task priority (lower is more urgent)
+            
+        Returns:
+            dict: {'success': bool, 'task_id': str or None, 'error': str or None}
+        """
+        data = {
+            'caseId': case_id,
+            'taskType': 'CP2000_REVIEW',
+            'priority': priority,
+            'dueDate': due_date,
+            'title': subject,
+            'description': comments
+        }
+        
+        try:
+            response = self._request_with_retry(
+                'POST',
+                f"{self.base_url}/tasks/create",
+                idempotent=False,
+                headers=self.headers,
+                json=data
+            )
+        except Exception as e:
+            logger.error(f"Failed to create task: {str(e)}")
+            return {'success': False, 'task_id': None, 'error': str(e)}
+        
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        task_id = (body.get('taskId') or body.get('id')) if isinstance(body, dict) else None
+        
+        logger.info(f"✅ Created task for Case {case_id}")
+        return {'success': True, 'task_id': task_id, 'error': None}
+    
     def upload_document(self, case_id: str, file_path: str, 
                        document_type: str, tax_year: str) -> bool:
         """
@@ -39,42 +242,9 @@ class LogiqsDocumentUploader:
         Returns:
             bool: True if upload successful
         """
-        try:
-            if not os.path.exists(file_path):
-                logger.error(f"File not found: {file_path}")
-                return False
-            
-            # Prepare upload
-            url = f"{self.base_url}/documents/upload"
-            
-            files = {
-                'file': (os.path.basename(file_path), 
-                        open(file_path, 'rb'),
-                        'application/pdf')
-            }
-            
-            data = {
-                'caseId': case_id,
-                'documentType': document_type,
-                'taxYear': tax_year
-            }
-            
-            # Make request
-            response = requests.post(
-                url,
-                headers=self.headers,
-                data=data,
-                files=files
-            )
-            
-            response.raise_for_status()
-            
-            logger.info(f"✅ Document uploaded for Case {case_id}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to upload document: {str(e)}")
-            return False
+        result = self.upload_to_logiqs(case_id, file_path,
+                                       document_type=document_type, tax_year=tax_year)
+        return result['success']
             
     def create_cp2000_task(self, case_id: str, notice_date: str,
                           tax_year: str, ref_number: str) -> bool:
@@ -106,14 +276,14 @@ class LogiqsDocumentUploader:
             }
             
             # Create task
-            response = requests.post(
+            self._request_with_retry(
+                'POST',
                 url,
+                idempotent=False,
                 headers=self.headers,
                 json=data
             )
             
-            response.raise_for_status()
-            
             logger.info(f"✅ Created CP2000 task for Case {case_id}")
             return True
             
@@ -139,14 +309,13 @@ class LogiqsDocumentUploader:
                 'status': status
             }
             
-            response = requests.patch(
+            self._request_with_retry(
+                'PATCH',
                 url, 
                 headers=self.headers,
                 json=data
             )
             
-            response.raise_for_status()
-            
             logger.info(f"✅ Updated task {task_id} status to {status}")
             return True
             
@@ -191,6 +360,8 @@ def main():
             logger.error("❌ Task creation test failed")
     else:
         logger.warning(f"Test file not found: {test_file}")
+    
+    uploader.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -13,11 +13,15 @@ This pipeline:
 """
 
 import os
+import re
 import sys
 import json
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 # Add current directory to path
@@ -25,10 +29,12 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
-from hundred_percent_accuracy_extractor import HundredPercentAccuracyExtractor
-from logics_case_search import LogicsCaseSearcher
-from upload_to_logiqs import LogiqsDocumentUploader
-import pandas as pd
+from googleapiclient.http import MediaIoBaseDownload
+
+from api_utils import json_loads, json_dumps
+
+# The extractor (OpenCV/PyMuPDF/Tesseract), Logiqs clients, pandas and openpyxl
+# are imported where they are first used so commands that don't need them start fast
 
 # Setup logging
 logging.basicConfig(
@@ -37,6 +43,51 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Instruction rows written above the matched cases in the approval Excel
+APPROVAL_INSTRUCTIONS = [
+    '=== INSTRUCTIONS ===',
+    'Review each matched case below',
+    'In Status column, enter: APPROVE, UNDER_REVIEW, or REJECT',
+    'APPROVE = Upload to Logiqs + Create Task',
+    'UNDER_REVIEW = Skip for now',
+    'REJECT = Move to UNMATCHED folder',
+    'Save file and run: python3 automated_pipeline.py --upload-approved',
+    '',
+]
+
+@lru_cache(maxsize=None)
+def _load_drive_credentials(key_path, scopes):
+    """Parse the service account key once per process per scope set"""
+    return service_account.Credentials.from_service_account_file(key_path, scopes=list(scopes))
+
+
+def _load_json_file(path, default):
+    """Load a JSON state file, or return `default` if it doesn't exist yet"""
+    try:
+        with open(path, 'rb') as f:
+            return json_loads(f.read())
+    except FileNotFoundError:
+        return default
+
+
+def _write_json_file(path, data):
+    """Write a JSON state file atomically - never leaves a half-written file"""
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(json_dumps(data, indent=True))
+    os.replace(tmp_file, path)
+
+
+# Drive media is streamed to disk in chunks of this size instead of buffered whole
+DRIVE_DOWNLOAD_CHUNKSIZE = 1024 * 1024
+
+# Drive accepts at most 100 calls per batch request
+DRIVE_BATCH_SIZE = 100
+
+# Stored with every EXTRACTION_CACHE.json entry; bump it when the extractor's
+# output changes so results cached by an older extractor are re-extracted
+EXTRACTION_CACHE_VERSION = 2
+
 
 class AutomatedMailRoomPipeline:
     """Automated pipeline with file watching and approval workflow"""
@@ -57,6 +108,16 @@ class AutomatedMailRoomPipeline:
         self.SCOPES = ['https://www.googleapis.com/auth/drive']
         self.creds = None
         self.drive_service = None
+        self._local = threading.local()  # Per-thread Drive clients for download workers
+        self.download_workers = 8
+        self.lookup_workers = 10  # Concurrent Logiqs case searches
+        
+        # Working directories, created once up front. Downloads land in
+        # temp_dir and are deleted as soon as they are extracted.
+        self.temp_dir = 'TEMP_PROCESSING'
+        self.review_dir = 'QUALITY_REVIEW'
+        for directory in (self.temp_dir, self.review_dir):
+            os.makedirs(directory, exist_ok=True)
         
         # Folder IDs
         self.main_folder_id = '18e8lj66Mdr7PFGhJ7ySYtsnkNgiuczmx'
@@ -66,14 +127,27 @@ class AutomatedMailRoomPipeline:
         # Load test folders
         self.load_test_folders()
         
-        # Processing tracking
+        # Processing tracking (history is kept in memory and flushed once per run)
+        self.history_file = 'PROCESSING_HISTORY.json'
+        self.history = {}
         self.processed_file_ids = set()
         self.load_processing_history()
         
-        # Initialize components
-        self.extractor = HundredPercentAccuracyExtractor()
-        self.case_searcher = LogicsCaseSearcher()
-        self.uploader = LogiqsDocumentUploader()
+        # Extraction results keyed by Drive file id + md5Checksum, so a file
+        # that is seen again unchanged skips OCR
+        self.extraction_cache_file = 'EXTRACTION_CACHE.json'
+        self.extraction_cache = _load_json_file(self.extraction_cache_file, {})
+        self._extraction_cache_dirty = False
+        
+        # Full SSNs seen this run. Shared with the extractor, which rejects an
+        # SSN it has already seen, so files answered from the cache count too.
+        self.seen_ssns = set()
+        
+        # Components are created on first use (see the properties below)
+        self._extractor = None
+        self._case_searcher = None
+        self._uploader = None
+        self._component_lock = threading.Lock()
         
         # Results
         self.matched_cases = []
@@ -81,61 +155,87 @@ class AutomatedMailRoomPipeline:
         
         logger.info(f"🤖 Automated Pipeline initialized (test_mode={test_mode}, limit={file_limit})")
     
+    def _component(self, attr, factory):
+        """Create a component once, even when first touched from worker threads"""
+        if getattr(self, attr) is None:
+            with self._component_lock:
+                if getattr(self, attr) is None:
+                    setattr(self, attr, factory())
+        return getattr(self, attr)
+    
+    @property
+    def extractor(self):
+        """PDF extractor (imports OpenCV/PyMuPDF/Tesseract on first use)"""
+        def create():
+            from hundred_percent_accuracy_extractor import HundredPercentAccuracyExtractor
+            extractor = HundredPercentAccuracyExtractor()
+            extractor.processed_ssns = self.seen_ssns
+            return extractor
+        return self._component('_extractor', create)
+    
+    @property
+    def case_searcher(self):
+        """Logiqs case searcher"""
+        def create():
+            from logics_case_search import LogicsCaseSearcher
+            return LogicsCaseSearcher()
+        return self._component('_case_searcher', create)
+    
+    @property
+    def uploader(self):
+        """Logiqs document uploader"""
+        def create():
+            from upload_to_logiqs import LogiqsDocumentUploader
+            return LogiqsDocumentUploader()
+        return self._component('_uploader', create)
+    
     def load_test_folders(self):
         """Load TEST folder IDs"""
         test_folders_file = '.test_folders.json'
-        if os.path.exists(test_folders_file):
+        try:
             with open(test_folders_file, 'r') as f:
                 folders = json.load(f)
-                self.test_matched_folder = folders.get('matched_id')
-                self.test_unmatched_folder = folders.get('unmatched_id')
-        else:
-            self.test_matched_folder = None
-            self.test_unmatched_folder = None
+        except FileNotFoundError:
+            folders = {}
+        self.test_matched_folder = folders.get('matched_id')
+        self.test_unmatched_folder = folders.get('unmatched_id')
     
     def load_processing_history(self):
         """Load history of processed files"""
-        history_file = 'PROCESSING_HISTORY.json'
-        if os.path.exists(history_file):
-            with open(history_file, 'r') as f:
-                history = json.load(f)
-                self.processed_file_ids = set(history.keys())
+        self.history = _load_json_file(self.history_file, {})
+        self.processed_file_ids = set(self.history.keys())
         logger.info(f"📋 Loaded {len(self.processed_file_ids)} previously processed files")
     
     def save_processing_history(self, file_id, filename, status):
-        """Save file to processing history"""
-        history_file = 'PROCESSING_HISTORY.json'
-        
-        history = {}
-        if os.path.exists(history_file):
-            with open(history_file, 'r') as f:
-                history = json.load(f)
-        
-        history[file_id] = {
+        """Record a file in the processing history (written by flush_processing_history)"""
+        self.history[file_id] = {
             'filename': filename,
             'status': status,
             'processed_at': datetime.now().isoformat()
         }
-        
-        with open(history_file, 'w') as f:
-            json.dump(history, f, indent=2)
-        
         self.processed_file_ids.add(file_id)
     
+    def flush_processing_history(self):
+        """Write the processing history (and extraction cache) to disk in one go"""
+        _write_json_file(self.history_file, self.history)
+        if self._extraction_cache_dirty:
+            _write_json_file(self.extraction_cache_file, self.extraction_cache)
+            self._extraction_cache_dirty = False
+    
     def authenticate_google_drive(self):
         """Authenticate with Google Drive"""
         logger.info("🔐 Authenticating with Google Drive...")
-        self.creds = service_account.Credentials.from_service_account_file(
-            self.SERVICE_ACCOUNT_FILE, scopes=self.SCOPES
-        )
-        self.drive_service = build('drive', 'v3', credentials=self.creds)
+        self.creds = _load_drive_credentials(self.SERVICE_ACCOUNT_FILE, tuple(self.SCOPES))
+        self.drive_service = build('drive', 'v3', credentials=self.creds, cache_discovery=False, static_discovery=True)
+        self._local.service = self.drive_service  # Seed the per-thread client cache
         logger.info("✅ Google Drive authenticated")
     
     def find_input_folder(self):
         """Find CP2000 NEW BATCH 2 folder"""
         results = self.drive_service.files().list(
             q=f"'{self.main_folder_id}' in parents and name='{self.input_folder_name}' and trashed=false",
-            fields='files(id, name)'
+            fields='files(id)',
+            pageSize=1
         ).execute()
         
         folders = results.get('files', [])
@@ -153,19 +253,29 @@ class AutomatedMailRoomPipeline:
             if not self.find_input_folder():
                 return []
         
-        # Query for PDFs
+        # Query for PDFs, oldest first. Processed files are moved out of the input
+        # folder, so a modifiedTime cutoff would skip backlog files left behind by
+        # --limit; instead stop paging as soon as the limit is filled.
         query = f"'{self.input_folder_id}' in parents and mimeType='application/pdf' and trashed=false"
-        
-        results = self.drive_service.files().list(
-            q=query,
-            fields='files(id, name)',
-            pageSize=1000
-        ).execute()
-        
-        all_files = results.get('files', [])
-        
-        # Filter out already processed files
-        new_files = [f for f in all_files if f['id'] not in self.processed_file_ids]
+        page_size = min(self.file_limit, 1000) if self.file_limit else 1000
+        
+        new_files = []
+        page_token = None
+        while True:
+            results = self.drive_service.files().list(
+                q=query,
+                fields='nextPageToken, files(id, name, md5Checksum)',
+                orderBy='createdTime',
+                pageSize=page_size,
+                pageToken=page_token
+            ).execute()
+            
+            # Filter out already processed files (e.g. ones whose move failed)
+            new_files.extend(f for f in results.get('files', []) if f['id'] not in self.processed_file_ids)
+            
+            page_token = results.get('nextPageToken')
+            if not page_token or (self.file_limit and len(new_files) >= self.file_limit):
+                break
         
         # Apply limit if in test mode
         if self.file_limit and len(new_files) > self.file_limit:
@@ -174,58 +284,145 @@ class AutomatedMailRoomPipeline:
         logger.info(f"📁 Found {len(new_files)} new files to process")
         return new_files
     
+    def _thread_drive_service(self):
+        """Drive client for the current thread (googleapiclient is not thread-safe)"""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = build('drive', 'v3', credentials=self.creds, cache_discovery=False, static_discovery=True)
+            self._local.service = service
+        return service
+    
+    def download_file(self, file_info):
+        """Download a single file to TEMP_PROCESSING and return its local path"""
+        # Drive allows duplicate names, and downloads run concurrently - a
+        # directory per file id keeps two same-named PDFs from sharing (and
+        # truncating) one path, while the extractor still sees the Drive name
+        download_dir = os.path.join(self.temp_dir, file_info['id'])
+        os.makedirs(download_dir, exist_ok=True)
+        local_path = os.path.join(download_dir, file_info['name'])
+        
+        request = self._thread_drive_service().files().get_media(fileId=file_info['id'])
+        try:
+            with open(local_path, 'wb') as f:
+                downloader = MediaIoBaseDownload(f, request, chunksize=DRIVE_DOWNLOAD_CHUNKSIZE)
+                done = False
+                while not done:
+                    _, done = downloader.next_chunk()
+        except Exception:
+            # Don't leave a partial PDF (or its directory) behind
+            if os.path.exists(local_path):
+                os.unlink(local_path)
+            os.rmdir(download_dir)
+            raise
+        
+        return local_path
+    
+    @staticmethod
+    def _discard_download(local_path):
+        """Delete a downloaded PDF and its per-file directory"""
+        os.unlink(local_path)
+        os.rmdir(os.path.dirname(local_path))
+    
     def download_and_process_file(self, file_info):
-        """Download and process a single file"""
-        file_id = file_info['id']
+        """Download (unless its extraction is cached) and process a single file"""
+        cached = self._cached_extraction(file_info) is not None
+        return self.process_downloaded_file(file_info, None if cached else self.download_file(file_info))
+    
+    def process_downloaded_file(self, file_info, local_path):
+        """Extract and match a file that has already been downloaded"""
+        result = self.extract_file(file_info, local_path)
+        if result:
+            self.match_case(result)
+            self.record_result(result)
+        return result
+    
+    def _cached_extraction(self, file_info):
+        """Cached extraction for an unchanged file, or None"""
+        md5 = file_info.get('md5Checksum')
+        cached = self.extraction_cache.get(file_info['id'])
+        if (md5 and cached and cached.get('md5') == md5
+                and cached.get('version') == EXTRACTION_CACHE_VERSION):
+            return cached['extracted_data']
+        return None
+    
+    def extract_file(self, file_info, local_path=None):
+        """
+        Extract data from a file (not yet matched) and delete its download
+        
+        local_path may be None for a file with a cached extraction - see
+        _cached_extraction - since those are not downloaded.
+        """
         filename = file_info['name']
         
         logger.info(f"📄 Processing: {filename}")
         
-        # Download file
-        temp_dir = 'TEMP_PROCESSING'
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        local_path = os.path.join(temp_dir, filename)
-        
-        request = self.drive_service.files().get_media(fileId=file_id)
-        with open(local_path, 'wb') as f:
-            f.write(request.execute())
-        
-        # Extract data
-        extracted_data = self.extractor.extract_100_percent_accuracy_data(local_path)
+        # Extract data, reusing the cached result if the file is unchanged
+        file_id = file_info['id']
+        md5 = file_info.get('md5Checksum')
+        try:
+            extracted_data = self._cached_extraction(file_info)
+            if extracted_data is not None:
+                logger.info(f"♻️  Using cached extraction: {filename}")
+                # Claim its SSN as the extractor would have, so a later
+                # file with the same SSN is still rejected as a duplicate
+                digits = re.sub(r'\D', '', extracted_data.get('full_ssn') or '')
+                if len(digits) == 9:
+                    self.seen_ssns.add(f"{digits[:3]}-{digits[3:5]}-{digits[5:]}")
+            else:
+                extracted_data = self.extractor.extract_100_percent_accuracy_data(local_path)
+                # The extractor reports failures in 'error' rather than raising;
+                # those are retried on the next run instead of being cached.
+                # Neither is a result that depended on which files came before
+                # it (the duplicate-SSN check), as a later run may differ.
+                if (extracted_data and md5 and not extracted_data.get('error')
+                        and 'duplicate_ssn' not in extracted_data.get('quality_issues', [])):
+                    self.extraction_cache[file_id] = {
+                        'md5': md5,
+                        'version': EXTRACTION_CACHE_VERSION,
+                        'extracted_data': extracted_data
+                    }
+                    self._extraction_cache_dirty = True
+        finally:
+            # Nothing after extraction reads the PDF - files are moved on Drive
+            if local_path is not None:
+                self._discard_download(local_path)
         
         if not extracted_data:
             logger.warning(f"⚠️  Extraction failed: {filename}")
             return None
         
-        # Search for case in Logiqs
+        return {
+            'file_id': file_id,
+            'filename': filename,
+            'extracted_data': extracted_data,
+            'case_id': None,
+            'matched': False
+        }
+    
+    def match_case(self, result):
+        """Search Logiqs for the case behind an extracted file (safe to run on worker threads)"""
+        extracted_data = result['extracted_data']
         ssn_last_4 = extracted_data.get('ssn_last_4')
         taxpayer_name = extracted_data.get('taxpayer_name', '')
-        last_name = taxpayer_name.split()[-1] if taxpayer_name else ''
+        last_name = taxpayer_name.rstrip().rpartition(' ')[2] if taxpayer_name else ''
         
         case_id = None
         if ssn_last_4 and last_name:
             logger.info(f"🔍 Searching Logiqs: {last_name} (SSN: {ssn_last_4})")
             case_id = self.case_searcher.search_case(ssn_last_4, last_name)
         
-        # Build result
-        result = {
-            'file_id': file_id,
-            'filename': filename,
-            'local_path': local_path,
-            'extracted_data': extracted_data,
-            'case_id': case_id,
-            'matched': case_id is not None
-        }
-        
-        if case_id:
-            logger.info(f"✅ Matched to Case ID: {case_id}")
+        result['case_id'] = case_id
+        result['matched'] = case_id is not None
+        return result
+    
+    def record_result(self, result):
+        """File a matched/unmatched result"""
+        if result['case_id']:
+            logger.info(f"✅ Matched {result['filename']} to Case ID: {result['case_id']}")
             self.matched_cases.append(result)
         else:
-            logger.warning(f"⚠️  No match found")
+            logger.warning(f"⚠️  No match found: {result['filename']}")
             self.unmatched_cases.append(result)
-        
-        return result
     
     def move_file_to_folder(self, file_id, target_folder_id):
         """Move file to target folder"""
@@ -251,6 +448,46 @@ class AutomatedMailRoomPipeline:
             logger.error(f"❌ Failed to move file: {e}")
             return False
     
+    def move_files_to_folder(self, file_ids, target_folder_id):
+        """
+        Move files out of the input folder in batched Drive requests
+        
+        Args:
+            file_ids: IDs of files currently in the input folder
+            target_folder_id: Folder to move them to
+            
+        Returns:
+            set: IDs of the files that were moved
+        """
+        moved = set()
+        
+        def on_response(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"❌ Failed to move file {request_id}: {exception}")
+            else:
+                moved.add(request_id)
+        
+        # Every file comes from the input folder, so its parent is already
+        # known and no per-file files().get() is needed
+        for start in range(0, len(file_ids), DRIVE_BATCH_SIZE):
+            batch = self.drive_service.new_batch_http_request(callback=on_response)
+            for file_id in file_ids[start:start + DRIVE_BATCH_SIZE]:
+                batch.add(
+                    self.drive_service.files().update(
+                        fileId=file_id,
+                        addParents=target_folder_id,
+                        removeParents=self.input_folder_id,
+                        fields='id'
+                    ),
+                    request_id=file_id
+                )
+            try:
+                batch.execute()
+            except Exception as e:
+                logger.error(f"❌ Failed to move batch of files: {e}")
+        
+        return moved
+    
     def generate_approval_excel(self):
         """Generate approval Excel for matched cases"""
         if not self.matched_cases:
@@ -259,6 +496,11 @@ class AutomatedMailRoomPipeline:
         
         logger.info(f"📋 Generating approval Excel for {len(self.matched_cases)} matched cases...")
         
+        import pandas as pd
+        from openpyxl import Workbook
+        from openpyxl.utils import get_column_letter
+        from openpyxl.utils.dataframe import dataframe_to_rows
+        
         # Prepare data
         review_data = []
         for case in self.matched_cases:
@@ -269,12 +511,15 @@ class AutomatedMailRoomPipeline:
             tax_year = extracted.get('tax_year', 'Unknown')
             notice_date = extracted.get('notice_date', 'Unknown').replace('/', '.')
             taxpayer_name = extracted.get('taxpayer_name', '')
-            last_name = taxpayer_name.split()[-1] if taxpayer_name else 'Unknown'
+            last_name = (taxpayer_name or '').rstrip().rpartition(' ')[2] or 'Unknown'
             
             proposed_name = f"IRS_CORR_{letter_type}_{tax_year}_DTD_{notice_date}_{last_name}.pdf"
             
+            # Status/Notes sit next to Case_ID - they are what the reviewer fills in
             review_data.append({
                 'Case_ID': case['case_id'],
+                'Status': '',  # APPROVE / UNDER_REVIEW / REJECT
+                'Notes': '',
                 'Original_Filename': case['filename'],
                 'Proposed_Filename': proposed_name,
                 'Taxpayer_Name': taxpayer_name,
@@ -283,55 +528,48 @@ class AutomatedMailRoomPipeline:
                 'Tax_Year': tax_year,
                 'Notice_Date': extracted.get('notice_date', ''),
                 'Due_Date': extracted.get('response_due_date', ''),
-                'Match_Confidence': 'High',
-                'Status': '',  # APPROVE / UNDER_REVIEW / REJECT
-                'Notes': ''
+                'Match_Confidence': 'High'
             })
         
         # Create DataFrame
         df = pd.DataFrame(review_data)
         
-        # Add instructions
-        instructions = [
-            {'Case_ID': '=== INSTRUCTIONS ===', 'Status': '', 'Notes': ''},
-            {'Case_ID': 'Review each matched case below', 'Status': '', 'Notes': ''},
-            {'Case_ID': 'In Status column, enter: APPROVE, UNDER_REVIEW, or REJECT', 'Status': '', 'Notes': ''},
-            {'Case_ID': 'APPROVE = Upload to Logiqs + Create Task', 'Status': '', 'Notes': ''},
-            {'Case_ID': 'UNDER_REVIEW = Skip for now', 'Status': '', 'Notes': ''},
-            {'Case_ID': 'REJECT = Move to UNMATCHED folder', 'Status': '', 'Notes': ''},
-            {'Case_ID': 'Save file and run: python3 automated_pipeline.py --upload-approved', 'Status': '', 'Notes': ''},
-            {'Case_ID': '', 'Status': '', 'Notes': ''},
-        ]
-        
-        # Pad instructions with empty columns
-        for inst in instructions:
-            for col in df.columns:
-                if col not in inst:
-                    inst[col] = ''
-        
-        instructions_df = pd.DataFrame(instructions)
-        final_df = pd.concat([instructions_df, df], ignore_index=True)
-        
         # Save to Excel
-        os.makedirs('QUALITY_REVIEW', exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        excel_path = f'QUALITY_REVIEW/APPROVAL_MATCHED_CASES_{timestamp}.xlsx'
-        
-        with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-            final_df.to_excel(writer, sheet_name='Review & Approve', index=False)
-            
-            # Auto-adjust columns
-            worksheet = writer.sheets['Review & Approve']
-            for idx, col in enumerate(final_df.columns):
-                max_length = max(final_df[col].astype(str).map(len).max(), len(col)) + 2
-                col_letter = chr(65 + idx) if idx < 26 else chr(65 + idx // 26 - 1) + chr(65 + idx % 26)
-                worksheet.column_dimensions[col_letter].width = min(max_length, 50)
+        excel_path = os.path.join(self.review_dir, f'APPROVAL_MATCHED_CASES_{timestamp}.xlsx')
+        
+        # Header, then the instruction rows, then the cases - written straight
+        # to the sheet instead of padding and concatenating an instructions frame
+        workbook = Workbook()
+        worksheet = workbook.active
+        worksheet.title = 'Review & Approve'
+        worksheet.append(list(df.columns))
+        for instruction in APPROVAL_INSTRUCTIONS:
+            worksheet.append([instruction])
+        for row in dataframe_to_rows(df, index=False, header=False):
+            worksheet.append(row)
+        
+        # Auto-adjust columns from one pass over the frame (instructions live
+        # in the first column)
+        widths = df.astype(str).apply(lambda values: values.str.len().max())
+        widths.iloc[0] = max(widths.iloc[0], max(map(len, APPROVAL_INSTRUCTIONS)))
+        for idx, col in enumerate(df.columns, start=1):
+            worksheet.column_dimensions[get_column_letter(idx)].width = min(max(widths[col], len(col)) + 2, 50)
+        
+        workbook.save(excel_path)
         
         logger.info(f"✅ Approval Excel created: {excel_path}")
         return excel_path
     
-    def process_pipeline(self):
-        """Run the complete automated pipeline"""
+    def process_pipeline(self, dry_run=False):
+        """
+        Run the complete automated pipeline
+        
+        Args:
+            dry_run: If True, only list the files that would be processed. The
+                extractor and Logiqs clients are created lazily, so a dry run (or
+                a run with no new files) never loads them.
+        """
         logger.info("\n" + "=" * 80)
         logger.info("🚀 AUTOMATED MAIL ROOM PIPELINE - STARTING")
         if self.test_mode:
@@ -348,24 +586,59 @@ class AutomatedMailRoomPipeline:
             logger.info("✅ No new files to process")
             return
         
-        # Step 3: Process each file
-        for file_info in new_files:
-            self.download_and_process_file(file_info)
+        if dry_run:
+            logger.info("🔎 DRY RUN - would process:")
+            for file_info in new_files:
+                logger.info(f"   • {file_info['name']}")
+            return
+        
+        # Step 3: Process each file - downloads run ahead on a thread pool while
+        # extraction (CPU-bound, stateful duplicate-SSN tracking) stays in order
+        # here. Files with a cached extraction are not downloaded at all.
+        extracted = []
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+            futures = [None if self._cached_extraction(file_info) is not None
+                       else executor.submit(self.download_file, file_info)
+                       for file_info in new_files]
+            
+            for file_info, future in zip(new_files, futures):
+                try:
+                    local_path = future.result() if future is not None else None
+                except Exception as e:
+                    logger.error(f"❌ Failed to download {file_info['name']}: {e}")
+                    continue
+                try:
+                    result = self.extract_file(file_info, local_path)
+                except Exception as e:
+                    logger.error(f"❌ Failed to extract {file_info['name']}: {e}")
+                    continue
+                if result:
+                    extracted.append(result)
+        
+        # Look the cases up in Logiqs concurrently over the searcher's keep-alive
+        # session, then file the results in input order
+        with ThreadPoolExecutor(max_workers=self.lookup_workers) as executor:
+            for result in executor.map(self.match_case, extracted):
+                self.record_result(result)
         
         # Step 4: Move files to TEST folders
         logger.info(f"\n📦 Moving files to TEST folders...")
         
         # Move matched files
+        moved = self.move_files_to_folder([case['file_id'] for case in self.matched_cases], self.test_matched_folder)
         for case in self.matched_cases:
-            self.move_file_to_folder(case['file_id'], self.test_matched_folder)
             self.save_processing_history(case['file_id'], case['filename'], 'matched')
-            logger.info(f"✅ Moved to TEST/MATCHED: {case['filename']}")
+            if case['file_id'] in moved:
+                logger.info(f"✅ Moved to TEST/MATCHED: {case['filename']}")
         
         # Move unmatched files
+        moved = self.move_files_to_folder([case['file_id'] for case in self.unmatched_cases], self.test_unmatched_folder)
         for case in self.unmatched_cases:
-            self.move_file_to_folder(case['file_id'], self.test_unmatched_folder)
             self.save_processing_history(case['file_id'], case['filename'], 'unmatched')
-            logger.info(f"⚠️  Moved to TEST/UNMATCHED: {case['filename']}")
+            if case['file_id'] in moved:
+                logger.info(f"⚠️  Moved to TEST/UNMATCHED: {case['filename']}")
+        
+        self.flush_processing_history()
         
         # Step 5: Generate approval Excel
         excel_path = self.generate_approval_excel()
@@ -395,6 +668,7 @@ if __name__ == "__main__":
     parser.add_argument('--test', action='store_true', help='Run in test mode')
     parser.add_argument('--limit', type=int, default=15, help='Max files to process (default: 15)')
     parser.add_argument('--upload-approved', action='store_true', help='Upload approved cases from Excel')
+    parser.add_argument('--dry-run', action='store_true', help='List new files without processing them')
     
     args = parser.parse_args()
     
@@ -404,5 +678,5 @@ if __name__ == "__main__":
         file_limit=args.limit
     )
     
-    pipeline.process_pipeline()
+    pipeline.process_pipeline(dry_run=args.dry_run)
 
@@ -6,10 +6,16 @@ Uses service account authentication for production stability.
 
 import pandas as pd
 import os
-from datetime import datetime
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill, Font, NamedStyle
+import json
+import importlib.util
+from datetime import datetime, timezone
+from functools import lru_cache
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Font
+from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.datavalidation import DataValidation
+from google.auth.transport.requests import Request
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
@@ -22,24 +28,125 @@ logger = logging.getLogger(__name__)
 # Google Drive API scopes
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
 
+SERVICE_ACCOUNT_FILE = 'service-account-key.json'
+DRIVE_TOKEN_CACHE = '.drive_token.json'
+TOKEN_EXPIRY_MARGIN = 300  # Refresh cached tokens this many seconds before expiry
+
+# Files below this size go up in a single multipart request; larger ones use a
+# resumable session with big chunks
+RESUMABLE_UPLOAD_THRESHOLD = 5 * 1024 * 1024
+UPLOAD_CHUNKSIZE = 16 * 1024 * 1024
+
+# Built locally from the file id so the create call only has to return 'id'
+DRIVE_FILE_LINK = 'https://drive.google.com/file/d/{file_id}/view'
+
+# Identifier columns are read as text so Excel's numeric guess cannot strip
+# leading zeros; columns missing from a sheet are simply ignored
+CASE_DTYPES = {'case_id': str, 'ssn_last_4': str, 'notice_ref_number': str}
+
+# Reviewer columns appended to every case sheet
+TRACKING_COLUMNS = ['Status', 'Review Notes', 'Last Updated', 'Reviewed By']
+
+# Review sheet styles, built once
+BOLD_FONT = Font(bold=True)
+HEADER_FILL = PatternFill(start_color='CCCCCC', end_color='CCCCCC', fill_type='solid')
+MATCHED_FILL = PatternFill(start_color='C6EFCE', end_color='C6EFCE', fill_type='solid')  # Light green
+UNMATCHED_FILL = PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid')  # Light red
+STATUS_COLORS = {
+    'Pending': 'FFEB9C',  # Light yellow
+    'Approve': 'C6EFCE',  # Light green
+    'Reject': 'FFC7CE',   # Light red
+    'Review': 'BDD7EE'    # Light blue
+}
+STATUS_FILLS = {
+    status: PatternFill(start_color=color, end_color=color, fill_type='solid')
+    for status, color in STATUS_COLORS.items()
+}
+
+# The review workbook streams through xlsxwriter's constant_memory mode when
+# it is installed, otherwise through openpyxl's write-only mode
+REVIEW_EXCEL_ENGINE = 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') else 'openpyxl'
+
+@lru_cache(maxsize=1)
+def _drive_service(key_path, key_mtime, scopes):
+    """
+    Drive service shared by every CaseReviewer in the process.
+    
+    Reuses the access token persisted in DRIVE_TOKEN_CACHE by a previous run
+    while it is still valid, so repeated short runs skip the JWT signing and
+    the OAuth token exchange. Keyed on the key file's mtime.
+    """
+    creds = service_account.Credentials.from_service_account_file(key_path, scopes=list(scopes))
+    
+    try:
+        with open(DRIVE_TOKEN_CACHE, 'r') as f:
+            cached = json.load(f)
+        expiry = datetime.fromisoformat(cached['expiry'])
+        if (cached.get('key_mtime') == key_mtime and cached.get('scopes') == list(scopes)
+                and (expiry - datetime.now(timezone.utc).replace(tzinfo=None)).total_seconds() > TOKEN_EXPIRY_MARGIN):
+            creds.token = cached['token']
+            creds.expiry = expiry
+    except (OSError, ValueError, KeyError):
+        pass  # No usable cached token - fetch a fresh one
+    
+    if not creds.token:
+        creds.refresh(Request())
+        try:
+            fd = os.open(DRIVE_TOKEN_CACHE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({
+                    'token': creds.token,
+                    'expiry': creds.expiry.isoformat(),
+                    'key_mtime': key_mtime,
+                    'scopes': list(scopes)
+                }, f)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not cache Drive token: {e}")
+    
+    return build('drive', 'v3', credentials=creds)
+
+
 class CaseReviewer:
-    def __init__(self, input_file):
+    def __init__(self, input_file=None, output_dir=None):
         self.input_file = input_file
-        self.output_dir = os.path.join(os.path.dirname(input_file), "REVIEWED_CASES")
+        self.output_dir = output_dir or os.path.join(os.path.dirname(input_file), "REVIEWED_CASES")
         os.makedirs(self.output_dir, exist_ok=True)
         self.service = None
         
+        # (matched_df, unmatched_df) when built with from_frames
+        self.frames = None
+    
+    @classmethod
+    def from_frames(cls, matched_df, unmatched_df, output_dir):
+        """
+        Build a reviewer over in-memory matched/unmatched cases
+        
+        process_cases then writes them straight to the review file instead of
+        reading and splitting an input workbook.
+        
+        Args:
+            matched_df (DataFrame): Matched cases
+            unmatched_df (DataFrame): Unmatched cases
+            output_dir (str): Folder for the review file
+            
+        Returns:
+            CaseReviewer: Reviewer ready for process_cases
+        """
+        reviewer = cls(output_dir=output_dir)
+        reviewer.frames = (matched_df, unmatched_df)
+        return reviewer
+        
     def get_drive_service(self):
         """Set up Google Drive API service using service account"""
         if self.service:
             return self.service
             
         try:
-            creds = service_account.Credentials.from_service_account_file(
-                'service-account-key.json',
-                scopes=SCOPES
+            self.service = _drive_service(
+                SERVICE_ACCOUNT_FILE,
+                os.path.getmtime(SERVICE_ACCOUNT_FILE),
+                tuple(SCOPES)
             )
-            self.service = build('drive', 'v3', credentials=creds)
             logger.info("✅ Authenticated with Google Drive (Service Account)")
             return self.service
             
@@ -64,20 +171,23 @@ class CaseReviewer:
             if folder_id:
                 file_metadata['parents'] = [folder_id]
             
+            resumable = os.path.getsize(file_path) >= RESUMABLE_UPLOAD_THRESHOLD
             media = MediaFileUpload(
                 file_path,
                 mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                resumable=True
+                resumable=resumable,
+                chunksize=UPLOAD_CHUNKSIZE if resumable else -1
             )
             
             file = service.files().create(
                 body=file_metadata,
                 media_body=media,
-                fields='id, webViewLink'
+                fields='id'
             ).execute()
             
-            logger.info(f"✅ File uploaded to Drive: {file.get('webViewLink')}")
-            return file.get('webViewLink')
+            link = DRIVE_FILE_LINK.format(file_id=file['id'])
+            logger.info(f"✅ File uploaded to Drive: {link}")
+            return link
             
         except Exception as e:
             logger.error(f"❌ Error uploading to Drive: {str(e)}")
@@ -95,9 +205,12 @@ class CaseReviewer:
             # Identify dates after current year
             future_dates = df['notice_date'] > f'{current_year}-12-31'
             
-            # For future dates, adjust to current year
-            df.loc[future_dates, 'notice_date'] = df.loc[future_dates, 'notice_date'].apply(
-                lambda x: x.replace(year=current_year)
+            # For future dates, adjust to current year (rebuilt from month/day in
+            # one vectorized call; a Feb 29 that doesn't exist becomes blank)
+            future = df.loc[future_dates, 'notice_date']
+            df.loc[future_dates, 'notice_date'] = pd.to_datetime(
+                pd.DataFrame({'year': current_year, 'month': future.dt.month, 'day': future.dt.day}),
+                errors='coerce'
             )
             
             # Format dates as string in MM/DD/YYYY format
@@ -109,26 +222,175 @@ class CaseReviewer:
             logger.error(f"Error fixing notice dates: {str(e)}")
             return df
 
+    def _write_review_sheet(self, wb, title, df, summary, summary_fill):
+        """
+        Append a formatted review sheet to a write-only workbook
+        
+        Row 1 is a merged summary banner, row 2 the headers, and the cases
+        follow with a Status dropdown color-coded by value. Blank statuses
+        must already be defaulted (see default_status).
+        """
+        ws = wb.create_sheet(title)
+        columns = list(df.columns)
+        status_idx = columns.index('Status')
+        status_letter = get_column_letter(status_idx + 1)
+        
+        # Column widths must be set before the first row of a write-only sheet;
+        # take the longest value per column in one vectorized pass
+        lengths = df.astype(str).apply(lambda values: values.str.len()).where(df.notna(), 0).max().fillna(0)
+        for idx, name in enumerate(columns, start=1):
+            width = max(int(lengths.iloc[idx - 1]), len(str(name)))
+            ws.column_dimensions[get_column_letter(idx)].width = min(width, 60) + 2
+        
+        # Summary row at the top
+        summary_cell = WriteOnlyCell(ws, value=summary)
+        summary_cell.font = BOLD_FONT
+        summary_cell.fill = summary_fill
+        ws.append([summary_cell])
+        ws.merged_cells.add(f"A1:{get_column_letter(len(columns))}1")
+        
+        # Headers in row 2
+        header = []
+        for name in columns:
+            cell = WriteOnlyCell(ws, value=name)
+            cell.font = BOLD_FONT
+            cell.fill = HEADER_FILL
+            header.append(cell)
+        ws.append(header)
+        
+        # Set up data validation for Status column
+        dv = DataValidation(
+            type="list",
+            formula1='"Approve,Reject,Review,Pending"',
+            allow_blank=False
+        )
+        ws.data_validations.append(dv)
+        if len(df):
+            # One range for the whole column instead of a coordinate per row
+            dv.add(f"{status_letter}3:{status_letter}{len(df) + 2}")
+        
+        # Color coding looked up for the whole column at once
+        fills = df['Status'].map(STATUS_FILLS)
+        
+        for row, fill in zip(df.itertuples(index=False, name=None), fills):
+            values = [None if pd.isna(value) else value for value in row]
+            
+            if not pd.isna(fill):
+                status_cell = WriteOnlyCell(ws, value=values[status_idx])
+                status_cell.fill = fill
+                values[status_idx] = status_cell
+            
+            ws.append(values)
+    
+    def _write_review_sheet_xlsxwriter(self, wb, title, df, summary, summary_fill):
+        """
+        Append a formatted review sheet to a constant_memory xlsxwriter workbook
+        
+        Same layout as _write_review_sheet; rows must be written top to bottom
+        because each one is flushed to disk once the next begins.
+        """
+        ws = wb.add_worksheet(title)
+        columns = list(df.columns)
+        status_idx = columns.index('Status')
+        last_col = len(columns) - 1
+        
+        summary_fmt = wb.add_format({'bold': True, 'bg_color': '#' + summary_fill.start_color.rgb[-6:]})
+        header_fmt = wb.add_format({'bold': True, 'bg_color': '#' + HEADER_FILL.start_color.rgb[-6:]})
+        status_fmts = {status: wb.add_format({'bg_color': '#' + color})
+                       for status, color in STATUS_COLORS.items()}
+        
+        lengths = df.astype(str).apply(lambda values: values.str.len()).where(df.notna(), 0).max().fillna(0)
+        for idx, name in enumerate(columns):
+            width = max(int(lengths.iloc[idx]), len(str(name)))
+            ws.set_column(idx, idx, min(width, 60) + 2)
+        
+        # Summary row at the top
+        if last_col:
+            ws.merge_range(0, 0, 0, last_col, summary, summary_fmt)
+        else:
+            ws.write(0, 0, summary, summary_fmt)
+        
+        # Headers in row 2
+        ws.write_row(1, 0, columns, header_fmt)
+        
+        if len(df):
+            ws.data_validation(2, status_idx, len(df) + 1, status_idx, {
+                'validate': 'list',
+                'source': ['Approve', 'Reject', 'Review', 'Pending'],
+                'ignore_blank': False
+            })
+        
+        for row_num, row in enumerate(df.itertuples(index=False, name=None), start=2):
+            values = [None if pd.isna(value) else value for value in row]
+            status = values[status_idx]
+            values[status_idx] = None
+            ws.write_row(row_num, 0, values)
+            ws.write(row_num, status_idx, status, status_fmts.get(status))
+    
+    def _save_review_workbook(self, output_file, sheets):
+        """
+        Write the review sheets to output_file in one streaming pass
+        
+        Args:
+            output_file (str): Path of the .xlsx to create
+            sheets (list): (title, df, summary, summary_fill) per sheet
+        """
+        if REVIEW_EXCEL_ENGINE == 'xlsxwriter':
+            import xlsxwriter
+            
+            wb = xlsxwriter.Workbook(output_file, {
+                'constant_memory': True,
+                'default_date_format': 'yyyy-mm-dd h:mm:ss'
+            })
+            for sheet in sheets:
+                self._write_review_sheet_xlsxwriter(wb, *sheet)
+            wb.close()
+        else:
+            wb = Workbook(write_only=True)
+            for sheet in sheets:
+                self._write_review_sheet(wb, *sheet)
+            wb.save(output_file)
+    
+    @staticmethod
+    def add_tracking_columns(df):
+        """Append any missing tracking columns in one assign instead of one insert each"""
+        missing = {col: 'Pending' if col == 'Status' else ''
+                   for col in TRACKING_COLUMNS if col not in df.columns}
+        return df.assign(**missing) if missing else df
+    
+    @staticmethod
+    def default_status(df):
+        """Set blank Status values to Pending (vectorized)"""
+        status = df['Status']
+        df['Status'] = status.where(status.notna() & (status != ''), 'Pending')
+        return df
+    
+    def _prepare_cases(self, df):
+        """Fix notice dates and add the tracking columns with Status defaulted"""
+        logger.info("Fixing notice dates...")
+        df = self.fix_notice_date(df)
+        
+        # Initialize tracking columns
+        return self.default_status(self.add_tracking_columns(df))
+    
     def process_cases(self):
         """Process the cases Excel file and add action buttons"""
         try:
-            # Read the Excel file
-            logger.info(f"Reading input file: {self.input_file}")
-            df = pd.read_excel(self.input_file)
-            
-            # Fix notice dates
-            logger.info("Fixing notice dates...")
-            df = self.fix_notice_date(df)
-            
-            # Initialize tracking columns
-            tracking_columns = ['Status', 'Review Notes', 'Last Updated', 'Reviewed By']
-            for col in tracking_columns:
-                if col not in df.columns:
-                    df[col] = 'Pending' if col == 'Status' else ''
+            if self.frames is not None:
+                matched_cases, unmatched_cases = (self._prepare_cases(df) for df in self.frames)
+            else:
+                # Read the Excel file
+                logger.info(f"Reading input file: {self.input_file}")
+                df = self._prepare_cases(pd.read_excel(self.input_file, dtype=CASE_DTYPES))
+                
+                # Split cases with one mask; the halves are only read, so no copies
+                if 'is_matched' in df.columns:
+                    mask = df['is_matched'].eq(True).to_numpy()
+                else:
+                    mask = df['case_id'].notna().to_numpy()
+                matched_cases = df.iloc[mask]
+                unmatched_cases = df.iloc[~mask]
             
-            # Split cases
-            matched_cases = df[df['is_matched'] if 'is_matched' in df.columns else df['case_id'].notna()].copy()
-            unmatched_cases = df[~df['is_matched'] if 'is_matched' in df.columns else df['case_id'].isna()].copy()
             logger.info(f"Found {len(matched_cases)} matched cases and {len(unmatched_cases)} unmatched cases")
             
             # Generate output filename with timestamp
@@ -138,114 +400,14 @@ class CaseReviewer:
                 f"CASES_WITH_ACTIONS_{timestamp}.xlsx"
             )
             
-            # Create Excel writer to save to multiple sheets
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                matched_cases.to_excel(writer, sheet_name='Matched Cases', index=False)
-                unmatched_cases.to_excel(writer, sheet_name='Unmatched Cases', index=False)
-            
-            # Load workbook for formatting
-            wb = load_workbook(output_file)
-            
-            # Create button style once for the workbook
-            try:
-                button_style = wb.named_styles['button_style']
-            except KeyError:
-                button_style = NamedStyle(name='button_style')
-                button_style.font = Font(bold=True)
-                button_style.fill = PatternFill(
-                    start_color='4472C4',
-                    end_color='4472C4',
-                    fill_type='solid'
-                )
-                wb.add_named_style(button_style)
-            
-            # Format each sheet
-            for sheet_name in ['Matched Cases', 'Unmatched Cases']:
-                ws = wb[sheet_name]
-                
-                # Insert summary row at the top
-                ws.insert_rows(1)
-                summary_cell = ws.cell(row=1, column=1)
-                if sheet_name == 'Matched Cases':
-                    summary_cell.value = f"✅ Matched Cases ({ws.max_row - 2} cases)"
-                    summary_cell.fill = PatternFill(
-                        start_color='C6EFCE',  # Light green
-                        end_color='C6EFCE',
-                        fill_type='solid'
-                    )
-                else:
-                    summary_cell.value = f"⚠️ Unmatched Cases ({ws.max_row - 2} cases)"
-                    summary_cell.fill = PatternFill(
-                        start_color='FFC7CE',  # Light red
-                        end_color='FFC7CE',
-                        fill_type='solid'
-                    )
-                summary_cell.font = Font(bold=True)
-                ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(list(ws.columns)))
-                
-                # Format headers in row 2
-                for col in range(1, ws.max_column + 1):
-                    cell = ws.cell(row=2, column=col)
-                    cell.font = Font(bold=True)
-                    cell.fill = PatternFill(
-                        start_color='CCCCCC',
-                        end_color='CCCCCC',
-                        fill_type='solid'
-                    )
-                    
-                    # Find Status column while iterating
-                    if cell.value == 'Status':
-                        status_col = col
-                
-                # Set up data validation for Status column
-                dv = DataValidation(
-                    type="list",
-                    formula1='"Approve,Reject,Review,Pending"',
-                    allow_blank=False
-                )
-                ws.add_data_validation(dv)
-                
-                # Apply validation and formatting to Status column
-                for row in range(3, ws.max_row + 1):  # Start from row 3 (data rows)
-                    cell = ws.cell(row=row, column=status_col)
-                    
-                    # Add validation to cell
-                    dv.add(cell)
-                    
-                    # Set default value for empty cells
-                    if not cell.value:
-                        cell.value = 'Pending'
-                    
-                    # Apply color coding
-                    status_colors = {
-                        'Pending': 'FFEB9C',  # Light yellow
-                        'Approve': 'C6EFCE',  # Light green
-                        'Reject': 'FFC7CE',   # Light red
-                        'Review': 'BDD7EE'    # Light blue
-                    }
-                    
-                    if cell.value in status_colors:
-                        cell.fill = PatternFill(
-                            start_color=status_colors[cell.value],
-                            end_color=status_colors[cell.value],
-                            fill_type='solid'
-                        )
-                
-                # Adjust column widths
-                for col in ws.columns:
-                    max_length = 0
-                    column = col[0].column_letter
-                    for cell in col:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = (max_length + 2)
-                    ws.column_dimensions[column].width = adjusted_width
-            
-            # Save the formatted file
-            wb.save(output_file)
+            # Build and save the formatted workbook in one streaming pass
+            # instead of writing it with pandas and reloading it to format
+            self._save_review_workbook(output_file, [
+                ('Matched Cases', matched_cases,
+                 f"✅ Matched Cases ({len(matched_cases)} cases)", MATCHED_FILL),
+                ('Unmatched Cases', unmatched_cases,
+                 f"⚠️ Unmatched Cases ({len(unmatched_cases)} cases)", UNMATCHED_FILL)
+            ])
             logger.info(f"✅ Successfully created review file: {output_file}")
             
             # Upload to Google Drive
@@ -266,33 +428,18 @@ def process_and_upload(matched_file=None, unmatched_file=None):
         if not unmatched_file:
             unmatched_file = os.path.join("QUALITY_REVIEW", "UNMATCHED_CASES.xlsx")
         
-        # Create a combined output folder
-        base_dir = os.path.dirname(matched_file)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        combined_output = os.path.join(base_dir, f"COMBINED_REVIEW_{timestamp}.xlsx")
+        # Review file goes next to the inputs
+        output_dir = os.path.join(os.path.dirname(matched_file), "REVIEWED_CASES")
         
         # Read both files
         logger.info("Reading matched cases file...")
-        matched_df = pd.read_excel(matched_file)
+        matched_df = pd.read_excel(matched_file, dtype=CASE_DTYPES)
         logger.info("Reading unmatched cases file...")
-        unmatched_df = pd.read_excel(unmatched_file)
-        
-        # Add tracking columns to both
-        tracking_columns = ['Status', 'Review Notes', 'Last Updated', 'Reviewed By']
-        for df in [matched_df, unmatched_df]:
-            for col in tracking_columns:
-                if col not in df.columns:
-                    df[col] = 'Pending' if col == 'Status' else ''
-        
-        logger.info("Creating combined Excel file...")
-        # Save to combined Excel file
-        with pd.ExcelWriter(combined_output, engine='openpyxl') as writer:
-            matched_df.to_excel(writer, sheet_name='Matched Cases', index=False)
-            unmatched_df.to_excel(writer, sheet_name='Unmatched Cases', index=False)
+        unmatched_df = pd.read_excel(unmatched_file, dtype=CASE_DTYPES)
         
-        # Format the combined file and upload to Drive
+        # Format both sheets straight from memory and upload to Drive
         logger.info("Formatting and uploading to Drive...")
-        reviewer = CaseReviewer(combined_output)
+        reviewer = CaseReviewer.from_frames(matched_df, unmatched_df, output_dir)
         output_file, drive_link = reviewer.process_cases()
         
         print("\n=== Case Review File Created and Uploaded ===")
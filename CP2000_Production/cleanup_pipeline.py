@@ -5,8 +5,11 @@ Handles cleanup of temporary files and archiving of old processed files
 """
 
 import os
+import gzip
 import shutil
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
@@ -35,31 +38,61 @@ class PipelineCleanup:
         self.temp_dirs = ['TEMP_PROCESSING']
         self.archive_dirs = ['PROCESSED_FILES', 'MATCHED_CASES']
         
+        # Concurrent archive moves (only matter when ARCHIVES is on another
+        # filesystem and a move becomes a copy)
+        self.archive_workers = 4
+        
     def check_file_age(self, file_path):
         """Get file age in days"""
         mtime = os.path.getmtime(file_path)
         age = datetime.now() - datetime.fromtimestamp(mtime)
         return age.days
     
+    def _mtime_cutoff(self, days):
+        """Latest mtime of a file more than `days` whole days old (age.days > days)"""
+        return time.time() - (days + 1) * 86400
+    
+    def _scan_files(self, top):
+        """
+        Yield (directory, entry) for every file under `top`
+        
+        Uses os.scandir so each file's stat comes from the directory read
+        (entry.stat) instead of a separate os.path.getmtime call.
+        """
+        pending = [top]
+        while pending:
+            directory = pending.pop()
+            try:
+                # Read the whole directory first - callers remove/move files
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError as e:
+                logger.error(f"❌ Error scanning {directory}: {e}")
+                continue
+            
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield directory, entry
+    
     def cleanup_temp_files(self):
         """Clean up temporary processing files"""
         logger.info("🧹 Cleaning up temporary files...")
         
+        cutoff = self._mtime_cutoff(self.temp_max_age)
+        
         for temp_dir in self.temp_dirs:
             if not os.path.exists(temp_dir):
                 continue
                 
-            for root, _, files in os.walk(temp_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    age = self.check_file_age(file_path)
-                    
-                    if age > self.temp_max_age:
-                        try:
-                            os.remove(file_path)
-                            logger.info(f"🗑️  Removed temp file: {file}")
-                        except Exception as e:
-                            logger.error(f"❌ Error removing {file}: {e}")
+            for _, entry in self._scan_files(temp_dir):
+                if entry.stat(follow_symlinks=False).st_mtime <= cutoff:
+                    try:
+                        os.remove(entry.path)
+                        logger.info(f"🗑️  Removed temp file: {entry.name}")
+                    except Exception as e:
+                        logger.error(f"❌ Error removing {entry.name}: {e}")
     
     def archive_old_files(self):
         """Archive old processed files"""
@@ -77,30 +110,33 @@ class PipelineCleanup:
         if not os.path.exists(dated_archive):
             os.makedirs(dated_archive)
         
-        for dir_name in self.archive_dirs:
-            if not os.path.exists(dir_name):
-                continue
+        cutoff = self._mtime_cutoff(self.archive_age)
+        
+        with ThreadPoolExecutor(max_workers=self.archive_workers) as executor:
+            for dir_name in self.archive_dirs:
+                if not os.path.exists(dir_name):
+                    continue
+                    
+                logger.info(f"Checking {dir_name} for files to archive...")
                 
-            logger.info(f"Checking {dir_name} for files to archive...")
+                for root, entry in self._scan_files(dir_name):
+                    if entry.stat(follow_symlinks=False).st_mtime <= cutoff:
+                        executor.submit(self._archive_file, dir_name, root, entry, dated_archive)
+    
+    def _archive_file(self, dir_name, root, entry, dated_archive):
+        """Move one file into the dated archive, keeping its path under dir_name"""
+        try:
+            # Create relative path structure in archive
+            rel_path = os.path.relpath(root, dir_name)
+            archive_path = os.path.join(dated_archive, dir_name, rel_path)
+            os.makedirs(archive_path, exist_ok=True)
             
-            for root, _, files in os.walk(dir_name):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    age = self.check_file_age(file_path)
-                    
-                    if age > self.archive_age:
-                        try:
-                            # Create relative path structure in archive
-                            rel_path = os.path.relpath(root, dir_name)
-                            archive_path = os.path.join(dated_archive, dir_name, rel_path)
-                            os.makedirs(archive_path, exist_ok=True)
-                            
-                            # Move file to archive
-                            shutil.move(file_path, os.path.join(archive_path, file))
-                            logger.info(f"📦 Archived: {file}")
-                            
-                        except Exception as e:
-                            logger.error(f"❌ Error archiving {file}: {e}")
+            # Move file to archive
+            shutil.move(entry.path, os.path.join(archive_path, entry.name))
+            logger.info(f"📦 Archived: {entry.name}")
+            
+        except Exception as e:
+            logger.error(f"❌ Error archiving {entry.name}: {e}")
     
     def cleanup_logs(self):
         """Rotate and clean up log files"""
@@ -110,28 +146,37 @@ class PipelineCleanup:
         if not os.path.exists(log_dir):
             return
             
-        for file in os.listdir(log_dir):
-            if not file.endswith('.log'):
-                continue
-                
-            file_path = os.path.join(log_dir, file)
-            age = self.check_file_age(file_path)
+        # Rotate logs older than 7 days, picked out in the same scandir pass
+        cutoff = self._mtime_cutoff(7)
+        with os.scandir(log_dir) as entries:
+            due_logs = [
+                entry for entry in entries
+                if entry.name.endswith('.log') and entry.is_file() and entry.stat().st_mtime <= cutoff
+            ]
+        
+        # Nothing aged out - the usual case for frequent cron runs
+        if not due_logs:
+            return
+        
+        archive_suffix = datetime.now().strftime('%Y%m%d')
+        for entry in due_logs:
+            file = entry.name
+            file_path = entry.path
             
-            # Rotate logs older than 7 days
-            if age > 7:
-                try:
-                    # Compress old log
-                    archive_name = f"{file}.{datetime.now().strftime('%Y%m%d')}.gz"
-                    with open(file_path, 'rb') as f_in:
-                        with gzip.open(os.path.join(log_dir, archive_name), 'wb') as f_out:
-                            shutil.copyfileobj(f_in, f_out)
-                    
-                    # Remove original
-                    os.remove(file_path)
-                    logger.info(f"📝 Rotated log: {file}")
-                    
-                except Exception as e:
-                    logger.error(f"❌ Error rotating log {file}: {e}")
+            try:
+                # Compress old log (level 1: logs compress well even at the
+                # fastest setting, several times quicker than the default 9)
+                archive_name = f"{file}.{archive_suffix}.gz"
+                with open(file_path, 'rb') as f_in:
+                    with gzip.open(os.path.join(log_dir, archive_name), 'wb', compresslevel=1) as f_out:
+                        shutil.copyfileobj(f_in, f_out, length=1024 * 1024)
+                
+                # Remove original
+                os.remove(file_path)
+                logger.info(f"📝 Rotated log: {file}")
+                
+            except Exception as e:
+                logger.error(f"❌ Error rotating log {file}: {e}")
     
     def check_disk_space(self):
         """Check and warn about disk space"""
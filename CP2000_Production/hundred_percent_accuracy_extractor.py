@@ -30,6 +30,7 @@ class HundredPercentAccuracyExtractor:
         self.setup_enhanced_patterns()
         self.setup_urgency_matrix()
         self.processed_ssns = set()  # Track SSNs to prevent duplicates
+        self.duplicate_ssn_rejected = False  # Set when the current file hit a tracked SSN
         
     def setup_urgency_matrix(self):
         """Define urgency mapping logic from letter type → urgency level"""
@@ -259,6 +260,7 @@ class HundredPercentAccuracyExtractor:
         if len(cleaned_ssn) > 4:
             if cleaned_ssn in self.processed_ssns:
                 print(f"    ⚠️ Duplicate SSN detected: {cleaned_ssn} in {filename}")
+                self.duplicate_ssn_rejected = True
                 return False
             
             self.processed_ssns.add(cleaned_ssn)
@@ -1116,6 +1118,7 @@ class HundredPercentAccuracyExtractor:
         """Extract data with 100% accuracy focus"""
         filename = os.path.basename(pdf_path)
         self.current_filename = filename  # Track current filename for date extraction
+        self.duplicate_ssn_rejected = False
         print(f"\n🎯 Processing: {filename}")
         
         # Initialize results with quality tracking
@@ -1217,6 +1220,9 @@ class HundredPercentAccuracyExtractor:
             
             # Extract SSN with MULTIPLE ENHANCED METHODS for 100% accuracy
             full_ssn = self.extract_ssn_with_multiple_methods(search_text, filename, header_text)
+            if self.duplicate_ssn_rejected:
+                # The result depends on which files were processed before this one
+                results['quality_issues'].append('duplicate_ssn')
             if full_ssn:
                 results['full_ssn'] = full_ssn
                 results['ssn_last_4'] = self.extract_ssn_last_4(full_ssn)
@@ -1,16 +1,23 @@
 import os
-import json
-import pandas as pd
+import re
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from pathlib import Path
 import logging
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+except ImportError:  # Optional; without it requests buffers the multipart body
+    MultipartEncoder = None
+
 # Import robust API utilities (TRA_API pattern)
-from api_utils import run_resiliently, resilient_api_call
+from api_utils import run_resiliently, resilient_api_call, retry_after_seconds, json_loads, json_dumps
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +29,25 @@ load_dotenv()
 # LOGICS_API_KEY and LOGIQS_API_KEY used in different places / docs.
 LOGICS_API_KEY = os.getenv('LOGICS_API_KEY') or os.getenv('LOGIQS_API_KEY') or os.getenv('LOGIQS_SECRET_TOKEN')
 
+# Concurrent FindCase lookups in search_many; the session pool is sized to match
+SEARCH_WORKERS = 10
+
+# How long a FindCase result is reused for the same taxpayer (seconds)
+CASE_CACHE_TTL = 24 * 60 * 60
+
+# Returned by _find_case when the search failed rather than found no match
+_SEARCH_FAILED = object()
+
+# Notice dates in filenames: MM.DD.YYYY or MM-DD-YYYY (space/dash separated),
+# one pass per pattern; "DTD"-prefixed dates win over any other date. Groups
+# are month, day (dotted), day (dashed), year.
+_DATE_BODY = r'(\d{2})(?:\.(\d{2})\.|[\s\-](\d{2})[\s\-])(\d{4})'
+DATE_PATTERNS = [
+    re.compile(r'DTD[_\s]+' + _DATE_BODY),  # DTD 07.15.2024 / DTD 07-15-2024
+    re.compile(_DATE_BODY),                 # 07.15.2024 / 07-15-2024
+]
+
+
 class LogicsCaseSearcher:
     def __init__(self, max_retries: int = 3, retry_delay: float = 2.0):
         # Get API key from environment variables, checking all possible names
@@ -45,6 +71,21 @@ class LogicsCaseSearcher:
         self.retry_delay = retry_delay
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # Enough pooled keep-alive connections for concurrent searches
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=SEARCH_WORKERS))
+        
+        # (ssn_last_4, LAST, FIRST) -> (time cached, search_case result), so a
+        # taxpayer with several notices in one run is looked up once
+        self._case_cache: Dict[Tuple[str, str, str], Tuple[float, Optional[Dict]]] = {}
+        
+        # time.monotonic() before which no request is sent - set from a 429's
+        # Retry-After so every search thread holds off, not just the one
+        # that was throttled
+        self._rate_limit_until = 0.0
+        
+        # Case output writer, created on the first match and reused after that
+        self._output_handler = None
+        self._output_handler_lock = threading.Lock()
         
         # Validate API key (log but don't raise so the pipeline can still run offline)
         if not self.api_key:
@@ -52,7 +93,18 @@ class LogicsCaseSearcher:
         
         logger.info("✅ LogicsCaseSearcher initialized with enhanced error handling")
 
-    def _make_request_with_retry(self, method: str, url: str, **kwargs) -> Optional[requests.Response]:
+    @property
+    def output_handler(self):
+        """CaseOutputHandler shared by every search (created once, even from worker threads)"""
+        if self._output_handler is None:
+            with self._output_handler_lock:
+                if self._output_handler is None:
+                    from case_output_handler import CaseOutputHandler
+                    self._output_handler = CaseOutputHandler()
+        return self._output_handler
+
+    def _make_request_with_retry(self, method: str, url: str, file_path: Optional[str] = None,
+                                 **kwargs) -> Optional[requests.Response]:
         """
         Make HTTP request with retry logic using run_resiliently.
         
@@ -62,6 +114,8 @@ class LogicsCaseSearcher:
         Args:
             method: HTTP method (GET, POST, etc.)
             url: Request URL
+            file_path: PDF to attach as multipart 'File', re-opened on every
+                attempt so a retry sends the full body
             **kwargs: Additional request parameters
             
         Returns:
@@ -69,37 +123,70 @@ class LogicsCaseSearcher:
         """
         def _request_internal():
             """Internal request function wrapped by run_resiliently"""
-            logger.debug(f"Making {method} request to {url}")
-            response = self.session.request(method, url, **kwargs)
+            logger.debug("Making %s request to %s", method, url)
+            
+            # Wait out whatever is left of a rate-limit window another search hit
+            wait = self._rate_limit_until - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
             
-            # Check for rate limiting
-            if response.status_code == 429:
-                retry_after = int(response.headers.get('Retry-After', self.retry_delay))
-                logger.warning(f"Rate limited. Waiting {retry_after} seconds...")
-                time.sleep(retry_after)
-                # Raise to trigger retry
-                raise Exception(f"Rate limited (429), retry after {retry_after}s")
+            if file_path is None:
+                response = self.session.request(method, url, **kwargs)
+            else:
+                with open(file_path, 'rb') as f:
+                    response = self._send_multipart(method, url, f, file_path, **kwargs)
             
-            # Raise for other error status codes to trigger retry
-            response.raise_for_status()
+            # Raise for error status codes to trigger retry; on a 429,
+            # run_resiliently waits out the server's Retry-After
+            try:
+                response.raise_for_status()
+            except requests.HTTPError as e:
+                if response.status_code == 429:
+                    retry_after = retry_after_seconds(e)
+                    deadline = time.monotonic() + (retry_after if retry_after is not None else self.retry_delay)
+                    self._rate_limit_until = max(self._rate_limit_until, deadline)
+                raise
             return response
         
         try:
-            # Use run_resiliently for automatic retry with backoff
+            # Use run_resiliently for automatic retry with backoff; the jitter
+            # keeps concurrent searches from retrying in lockstep
             return run_resiliently(
                 _request_internal,
                 max_retries=self.max_retries,
                 initial_delay=self.retry_delay,
                 backoff_factor=2.0,
-                max_delay=60.0
+                max_delay=60.0,
+                jitter=0.5
             )
         except Exception as e:
             logger.error(f"All retry attempts failed for {method} {url}: {str(e)}")
             return None
 
+    def _send_multipart(self, method: str, url: str, f, file_path: str,
+                        data: Optional[Dict] = None, **kwargs) -> requests.Response:
+        """Send form fields plus the open PDF as multipart/form-data"""
+        file_field = (os.path.basename(file_path), f, 'application/pdf')
+        fields = {k: str(v) for k, v in (data or {}).items() if v is not None}
+        
+        # Multipart needs its own Content-Type (with boundary), not the
+        # session's JSON one
+        if MultipartEncoder is None:
+            return self.session.request(method, url, headers={'Content-Type': None},
+                                        data=fields, files={'File': file_field}, **kwargs)
+        
+        # Stream the body from disk instead of assembling it in memory
+        encoder = MultipartEncoder(fields={**fields, 'File': file_field})
+        return self.session.request(method, url, headers={'Content-Type': encoder.content_type},
+                                    data=encoder, **kwargs)
+
     def search_case(self, ssn_last_4: str, last_name: str, first_name: Optional[str] = None, file_info: Optional[Dict] = None) -> Optional[Dict]:
         """
-        Search for a case using SSN last 4 digits and name with enhanced error handling
+        Search for a case, reusing the result of an identical recent search
+        
+        Answers from Logics (a match, or matchFound=false) are cached in-process
+        for CASE_CACHE_TTL seconds, keyed by SSN last 4 and the upper-cased
+        names. Failed searches are not cached.
         
         Args:
             ssn_last_4 (str): Last 4 digits of SSN
@@ -110,33 +197,63 @@ class LogicsCaseSearcher:
         Returns:
             Optional[Dict]: Case details and output file path if found, None otherwise
         """
+        # Normalize once; the stripped names feed both the cache key and the request
+        last_name = last_name.strip()
+        first_name = first_name.strip() if first_name else None
+        key = (ssn_last_4, last_name.upper(), (first_name or '').upper())
+        cached = self._case_cache.get(key)
+        if cached and time.time() - cached[0] < CASE_CACHE_TTL:
+            logger.info(f"Reusing Logics search for SSN: ***-**-{ssn_last_4}, Name: {last_name}")
+            return cached[1]
+        
+        result = self._find_case(ssn_last_4, last_name, first_name, file_info)
+        if result is _SEARCH_FAILED:
+            return None  # Not an answer - the next search for this taxpayer tries again
+        self._case_cache[key] = (time.time(), result)
+        return result
+
+    def _find_case(self, ssn_last_4: str, last_name: str, first_name: Optional[str] = None, file_info: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Search for a case using SSN last 4 digits and name with enhanced error handling
+        
+        Args:
+            ssn_last_4 (str): Last 4 digits of SSN
+            last_name (str): Last name of taxpayer, already stripped
+            first_name (Optional[str]): First name of taxpayer if available, already stripped
+            file_info (Optional[Dict]): Information about the source file
+            
+        Returns:
+            Optional[Dict]: Case details and output file path if found, None when
+            Logics answered that there is no match, or _SEARCH_FAILED when the
+            search itself failed (no response, 403, malformed body, error)
+        """
         try:
             # Use Case/FindCase endpoint
             url = f"{self.base_url}/Case/FindCase"
             
             # Prepare search parameters based on test_logics_api.py
             params = {
-                'LastName': last_name.strip(),
+                'LastName': last_name,
                 'Last4SSN': ssn_last_4,  # Just use the last 4 digits
                 'ActiveOnly': True  # Only get active cases
             }
             if first_name:
-                params['FirstName'] = first_name.strip()
+                params['FirstName'] = first_name
 
             logger.info(f"Searching Logics for SSN: ***-**-{ssn_last_4}, Name: {last_name}")
-            logger.debug(f"   Request URL: {url}")
-            logger.debug(f"   Parameters: {params}")
+            logger.debug("   Request URL: %s", url)
+            logger.debug("   Parameters: %s", params)
             
             # Use POST request for Case search
-            response = self._make_request_with_retry('POST', url, json=params, headers=self.headers)
+            response = self._make_request_with_retry('POST', url, json=params)
             
             if response:
                 # Log response status for debugging
-                logger.debug(f"   Response Status: {response.status_code}")
+                logger.debug("   Response Status: %s", response.status_code)
                 
                 # Check for specific error responses
                 if response.status_code == 403:
-                    error_data = response.json()
+                    error_data = json_loads(response.content)
                     error_msg = error_data.get('detail', 'Access forbidden')
                     
                     if 'Invalid or expired API Key' in error_msg:
@@ -148,43 +265,33 @@ class LogicsCaseSearcher:
                     else:
                         logger.error(f"❌ API returned 403: {error_msg}")
                     
-                    return None
+                    return _SEARCH_FAILED
 
-                # Enhanced response debugging
-                logger.info("\n=== Response Debug Info ===")
-                logger.info(f"Status Code: {response.status_code}")
-                logger.info(f"Content-Type: {response.headers.get('content-type', 'not specified')}")
+                debug = logger.isEnabledFor(logging.DEBUG)
                 
-                # First try to get raw content
-                try:
-                    content = response.text[:2000]
-                    logger.info(f"\nRaw Content (truncated to 2000 chars):\n{content}")
-                except Exception as e:
-                    logger.error(f"Could not get raw content: {str(e)}")
+                # Enhanced response debugging - only rendered when DEBUG is on
+                if debug:
+                    logger.debug("\n=== Response Debug Info ===")
+                    logger.debug("Status Code: %s", response.status_code)
+                    logger.debug("Content-Type: %s", response.headers.get('content-type', 'not specified'))
+                    logger.debug("\nRaw Content (truncated to 2000 chars):\n%s", response.text[:2000])
                     
-                # Then try to parse as JSON if possible
+                # Parse the response once
                 try:
-                    data = response.json()
-                    logger.info(f"\nJSON Response:\n{json.dumps(data, indent=2)}")
+                    data = json_loads(response.content)
                 except Exception as e:
                     logger.error(f"Failed to parse response as JSON: {str(e)}")
                     if "<!DOCTYPE html>" in response.text:
                         logger.error("Received HTML response instead of JSON")
                     elif "<?xml" in response.text:
                         logger.error("Received XML response instead of JSON")
-                        
-                logger.info("=== End Response Debug Info ===\n")
-                
-                # Success - parse response
-                data = response.json()
-                
-                # Log full response for debugging
-                logger.debug(f"   Full API Response: {json.dumps(data, indent=2)[:500]}")
+                    return _SEARCH_FAILED
                 
-                                                # Enhanced response validation with case output handling
-                from case_output_handler import CaseOutputHandler
-                output_handler = CaseOutputHandler()
+                if debug:
+                    logger.debug("\nJSON Response:\n%s", json_dumps(data, indent=True))
+                    logger.debug("=== End Response Debug Info ===\n")
                 
+                # Enhanced response validation with case output handling
                 if isinstance(data, dict):
                     # Check for new API format with matchFound
                     if data.get('matchFound') == True:
@@ -202,17 +309,17 @@ class LogicsCaseSearcher:
                                     'date_received': datetime.now().strftime('%Y-%m-%d')
                                 }
                                 
-                                formatted_output = output_handler.format_case_output(case_data['data'], file_info)
-                                output_path = output_handler.save_case_output(formatted_output)
+                                formatted_output = self.output_handler.format_case_output(case_data['data'], file_info)
+                                output_path = self.output_handler.save_case_output(formatted_output)
                                 logger.info(f"✅ Case output saved with action buttons: {output_path}")
                                 
                                 return {'case_data': data, 'output_file': output_path}
                             else:
                                 logger.warning("matchFound=true but no CaseID in response")
-                                return None
+                                return _SEARCH_FAILED
                         else:
                             logger.warning("matchFound=true but no caseData in response")
-                            return None
+                            return _SEARCH_FAILED
                     elif data.get('matchFound') == False:
                         logger.info("ℹ️ No matching cases found (matchFound=false)")
                         return None
@@ -227,17 +334,38 @@ class LogicsCaseSearcher:
                         return case
                     else:
                         logger.info("ℹ️ No matching cases found (no matchFound field)")
-                        return None
+                        return _SEARCH_FAILED
                 else:
                     logger.warning("Unexpected response format from Logics API")
-                    return None
+                    return _SEARCH_FAILED
             else:
                 logger.error("Failed to get response from Logics API")
-                return None
+                return _SEARCH_FAILED
                 
         except Exception as e:
             logger.error(f"Unexpected error searching case: {str(e)}")
-            return None
+            return _SEARCH_FAILED
+            
+    def search_many(self, queries: List[Tuple[str, str, Optional[str]]],
+                    max_workers: int = SEARCH_WORKERS) -> List[Optional[Dict]]:
+        """
+        Run several case searches concurrently over the pooled session
+        
+        Each lookup is an independent, network-bound FindCase round-trip, so
+        they overlap on a thread pool instead of waiting on one another.
+        
+        Args:
+            queries (List[Tuple]): (ssn_last_4, last_name, first_name) per search
+            max_workers (int): Number of searches in flight at once
+            
+        Returns:
+            List[Optional[Dict]]: search_case results in the order of queries
+        """
+        if not queries:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as executor:
+            return list(executor.map(lambda query: self.search_case(*query), queries))
             
     def upload_document(self, case_id: str, file_path: str, document_type: str) -> Optional[Dict]:
         """
@@ -272,33 +400,27 @@ class LogicsCaseSearcher:
             
             logger.info(f"Uploading document: {os.path.basename(file_path)} to case {case_id}")
             
-            # Prepare the file for upload
-            with open(file_path, 'rb') as f:
-                files = {
-                    'File': (os.path.basename(file_path), f, 'application/pdf')
-                }
-                
-                data = {
-                    'CaseID': case_id,
-                    'Comment': document_type,
-                    'FileCategoryID': None  # Optional
-                }
-                
-                # Use retry mechanism for upload
-                response = self._make_request_with_retry('POST', url, files=files, data=data)
-                
-                if response:
-                    result = response.json()
-                    if result.get('document_id'):
-                        logger.info(f"✅ Document uploaded successfully: {result['document_id']}")
-                        return result
-                    else:
-                        logger.error(f"Upload failed - no document_id in response: {result}")
-                        return None
+            data = {
+                'CaseID': case_id,
+                'Comment': document_type,
+                'FileCategoryID': None  # Optional
+            }
+            
+            # Use retry mechanism for upload; the PDF is streamed from disk
+            response = self._make_request_with_retry('POST', url, file_path=file_path, data=data)
+            
+            if response:
+                result = json_loads(response.content)
+                if result.get('document_id'):
+                    logger.info(f"✅ Document uploaded successfully: {result['document_id']}")
+                    return result
                 else:
-                    logger.error("Failed to upload document - no response")
+                    logger.error(f"Upload failed - no document_id in response: {result}")
                     return None
-                    
+            else:
+                logger.error("Failed to upload document - no response")
+                return None
+                
         except FileNotFoundError:
             logger.error(f"File not found: {file_path}")
             return None
@@ -336,7 +458,7 @@ class LogicsCaseSearcher:
             response = self._make_request_with_retry('POST', url, json=data)
             
             if response:
-                result = response.json()
+                result = json_loads(response.content)
                 if result.get('task_id'):
                     logger.info(f"✅ Task created successfully: {result['task_id']}")
                     return result
@@ -370,7 +492,7 @@ class LogicsCaseSearcher:
             response = self._make_request_with_retry('GET', url, params=params)
             
             if response:
-                result = response.json()
+                result = json_loads(response.content)
                 logger.info(f"✅ Case details retrieved for: {case_id}")
                 return result
             else:
@@ -422,35 +544,13 @@ def generate_document_name(original_filename: str, case_id: str) -> str:
         
         # Try to extract date from various patterns
         date_str = None
-        
-        # Pattern 1: DTD MM.DD.YYYY or DTD MM DD YYYY
-        dtd_patterns = [
-            r'DTD[_\s]+(\d{2})\.(\d{2})\.(\d{4})',      # DTD 07.15.2024
-            r'DTD[_\s]+(\d{2})[\s\-](\d{2})[\s\-](\d{4})', # DTD 07-15-2024
-        ]
-        
-        for pattern in dtd_patterns:
-            import re
-            matches = re.findall(pattern, filename_stem)
-            if matches:
-                month, day, year = matches[0]
-                date_str = f"{month}.{day}.{year}"
+        for pattern in DATE_PATTERNS:
+            match = pattern.search(filename_stem)
+            if match:
+                month, dotted_day, dashed_day, year = match.groups()
+                date_str = f"{month}.{dotted_day or dashed_day}.{year}"
                 break
         
-        # Pattern 2: Look for any date pattern
-        if not date_str:
-            date_patterns = [
-                r'(\d{2})\.(\d{2})\.(\d{4})',  # MM.DD.YYYY
-                r'(\d{2})[\s\-](\d{2})[\s\-](\d{4})',  # MM-DD-YYYY
-            ]
-            
-            for pattern in date_patterns:
-                matches = re.findall(pattern, filename_stem)
-                if matches:
-                    month, day, year = matches[0]
-                    date_str = f"{month}.{day}.{year}"
-                    break
-        
         # Fallback to current date
         if not date_str:
             date_str = datetime.now().strftime('%m.%d.%Y')
@@ -487,9 +587,8 @@ def main():
         ("3456", "O'CONNOR", "PATRICK"),  # Name with apostrophe
     ]
     
-    for ssn, last, first in test_cases:
-        logger.info(f"\nTesting search with: Last={last}, First={first}, SSN=xxx-xx-{ssn}")
-        test_result = searcher.search_case(ssn, last, first)
+    for (ssn, last, first), test_result in zip(test_cases, searcher.search_many(test_cases)):
+        logger.info(f"\nTested search with: Last={last}, First={first}, SSN=xxx-xx-{ssn}")
         if test_result:
             logger.info(f"✅ Test case search successful: {test_result}")
         else:
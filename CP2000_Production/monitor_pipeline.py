@@ -24,9 +24,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# check_log_files reads at most this much from the end of the log to find
+# its last LOG_TAIL_LINES lines
+LOG_TAIL_LINES = 100
+LOG_TAIL_BYTES = 64 * 1024
+
+# Linux pressure-stall (PSI) files and the 60s "some" stall percentage above
+# which the host counts as overloaded
+PRESSURE_FILES = {
+    'cpu': '/proc/pressure/cpu',
+    'memory': '/proc/pressure/memory',
+    'io': '/proc/pressure/io'
+}
+PRESSURE_THRESHOLD = 50.0
+
+# Working directories the pipeline expects next to the monitor
+REQUIRED_DIRS = (
+    'config', 'data', 'logs',
+    'MATCHED_CASES', 'UNMATCHED_CASES',
+    'QUALITY_REVIEW', 'PROCESSED_FILES',
+    'TEMP_PROCESSING'
+)
+
 class PipelineMonitor:
     def __init__(self):
         self.pipeline_process = None
+        self._process = None  # psutil handle for pipeline_process, reused across checks
         self.last_activity = None
         self.error_count = 0
         self.max_errors = 3
@@ -34,22 +57,18 @@ class PipelineMonitor:
         
     def check_directories(self):
         """Check if required directories exist and are writable"""
-        required_dirs = [
-            'config', 'data', 'logs',
-            'MATCHED_CASES', 'UNMATCHED_CASES',
-            'QUALITY_REVIEW', 'PROCESSED_FILES',
-            'TEMP_PROCESSING'
-        ]
+        # One directory read covers every existence check
+        with os.scandir('.') as entries:
+            existing = {entry.name for entry in entries if entry.is_dir()}
         
-        for dir_name in required_dirs:
-            dir_path = Path(dir_name)
-            if not dir_path.exists():
+        for dir_name in REQUIRED_DIRS:
+            if dir_name not in existing:
                 logger.error(f"❌ Directory missing: {dir_name}")
-                dir_path.mkdir(parents=True, exist_ok=True)
+                os.makedirs(dir_name, exist_ok=True)
                 logger.info(f"✅ Created directory: {dir_name}")
             
             # Check permissions
-            if not os.access(dir_path, os.W_OK):
+            if not os.access(dir_name, os.W_OK):
                 logger.error(f"❌ No write permission: {dir_name}")
                 return False
         
@@ -70,19 +89,32 @@ class PipelineMonitor:
         
         return True
     
+    def _pipeline_handle(self):
+        """
+        psutil.Process for the pipeline, kept between health checks
+        
+        psutil measures cpu_percent(interval=None) since the previous call on
+        the same handle, so reusing it gives the average over the whole check
+        interval without blocking. A new handle is primed on first use.
+        """
+        if self._process is None or self._process.pid != self.pipeline_process:
+            self._process = psutil.Process(self.pipeline_process)
+            self._process.cpu_percent(interval=None)
+        return self._process
+    
     def check_process_health(self):
         """Check if pipeline process is running and healthy"""
         if not self.pipeline_process:
             return False
             
         try:
-            process = psutil.Process(self.pipeline_process)
+            process = self._pipeline_handle()
             if process.status() == psutil.STATUS_ZOMBIE:
                 logger.error("❌ Pipeline process is zombie")
                 return False
                 
-            # Check CPU and memory usage
-            cpu_percent = process.cpu_percent(interval=1)
+            # Check CPU and memory usage (CPU averaged since the last check)
+            cpu_percent = process.cpu_percent(interval=None)
             mem_percent = process.memory_percent()
             
             if cpu_percent > 90:  # High CPU usage
@@ -93,6 +125,7 @@ class PipelineMonitor:
             return True
             
         except psutil.NoSuchProcess:
+            self._process = None
             logger.error("❌ Pipeline process not found")
             return False
     
@@ -117,6 +150,37 @@ class PipelineMonitor:
             return False
         return True
     
+    def check_system_pressure(self):
+        """
+        Check host CPU/memory/IO stall time from Linux PSI
+        
+        One small read per resource reports how long tasks were stalled over
+        the last minute. Without PSI (non-Linux or older kernels) falls back
+        to psutil's system-wide CPU usage since the previous check.
+        """
+        healthy = True
+        found = False
+        
+        for resource, path in PRESSURE_FILES.items():
+            try:
+                with open(path, 'r') as f:
+                    some = f.readline().split()  # "some avg10=.. avg60=.. avg300=.. total=.."
+            except OSError:
+                continue
+            
+            found = True
+            avg60 = float(dict(field.split('=') for field in some[1:])['avg60'])
+            if avg60 > PRESSURE_THRESHOLD:
+                logger.warning(f"⚠️ High {resource} pressure: {avg60}% stalled over 60s")
+                healthy = False
+        
+        if not found:
+            cpu_percent = psutil.cpu_percent(interval=None)
+            if cpu_percent > 90:
+                logger.warning(f"⚠️ High system CPU usage: {cpu_percent}%")
+        
+        return healthy
+    
     def check_log_files(self):
         """Check log files for errors"""
         log_file = 'logs/pipeline.log'
@@ -124,12 +188,19 @@ class PipelineMonitor:
             return True
             
         try:
-            with open(log_file, 'r') as f:
-                last_lines = f.readlines()[-100:]  # Check last 100 lines
-                error_count = sum(1 for line in last_lines if 'ERROR' in line)
-                if error_count > 5:  # More than 5 errors in last 100 lines
-                    logger.warning(f"⚠️ High error rate in logs: {error_count} errors")
-                    return False
+            # Read only the tail instead of the whole (possibly huge) log
+            with open(log_file, 'rb') as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - LOG_TAIL_BYTES))
+                tail = f.read().decode('utf-8', errors='replace').splitlines()
+            if size > LOG_TAIL_BYTES:
+                tail = tail[1:]  # First line is probably cut off
+            
+            last_lines = tail[-LOG_TAIL_LINES:]  # Check last 100 lines
+            error_count = sum(1 for line in last_lines if 'ERROR' in line)
+            if error_count > 5:  # More than 5 errors in last 100 lines
+                logger.warning(f"⚠️ High error rate in logs: {error_count} errors")
+                return False
         except Exception as e:
             logger.error(f"❌ Error reading log file: {e}")
             return False
@@ -149,6 +220,8 @@ class PipelineMonitor:
                     self.error_count += 1
                 if not self.check_disk_space():
                     self.error_count += 1
+                if not self.check_system_pressure():
+                    self.error_count += 1
                     
                 # Process checks
                 if not self.check_process_health():